@@ -0,0 +1,116 @@
+"""
+Compares NystroemOneClassSVM against the exact OneClassSVMWrapper on synthetic
+windows of increasing size, reporting fit time, per-sample predict time,
+agreement with the exact model and precision/recall on injected outliers.
+
+Usage: python benchmarks/one_class_svm.py --sizes 1000 5000 20000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+
+from anomaly.methods.one_class_svm import OneClassSVMWrapper
+from anomaly.methods.nystroem_one_class_svm import NystroemOneClassSVM
+
+
+def make_window(
+    n_samples: int, centers: np.ndarray, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Returns normalized telemetry-like samples drawn around a few regime centers.
+    """
+    n_features = centers.shape[1]
+    regimes = rng.integers(0, len(centers), size=n_samples)
+    return np.clip(
+        centers[regimes] + rng.normal(0, 0.05, (n_samples, n_features)), 0, 1
+    )
+
+
+def make_test_set(
+    n_samples: int, centers: np.ndarray, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns normal samples mixed with 5% uniform outliers and their labels.
+    """
+    n_features = centers.shape[1]
+    normal = make_window(n_samples, centers, rng)
+    n_outliers = n_samples // 20
+    outliers = rng.uniform(0, 1, size=(n_outliers, n_features))
+    labels = np.concatenate([np.zeros(n_samples), np.ones(n_outliers)])
+    return np.vstack([normal, outliers]), labels
+
+
+def run_method(method, X_train: np.ndarray, X_test: np.ndarray) -> dict:
+    start = time.perf_counter()
+    method.fit(X_train)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predictions = np.array([method.predict(x) for x in X_test])
+    predict_seconds = (time.perf_counter() - start) / len(X_test)
+
+    return {
+        "fit_seconds": fit_seconds,
+        "predict_seconds": predict_seconds,
+        "predictions": predictions,
+    }
+
+
+def precision_recall(
+    predictions: np.ndarray, labels: np.ndarray
+) -> tuple[float, float]:
+    true_positives = float(((predictions == 1) & (labels == 1)).sum())
+    precision = true_positives / max(predictions.sum(), 1)
+    recall = true_positives / max(labels.sum(), 1)
+    return precision, recall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--features", type=int, default=7)
+    parser.add_argument("--nu", type=float, default=0.01)
+    parser.add_argument("--test-samples", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    centers = rng.uniform(0.2, 0.8, size=(3, args.features))
+    X_test, labels = make_test_set(args.test_samples, centers, rng)
+
+    print(
+        f"{'size':>8} {'method':>22} {'fit s':>9} {'predict us':>11} "
+        f"{'precision':>10} {'recall':>7} {'agreement':>10}"
+    )
+    for size in args.sizes:
+        X_train = make_window(size, centers, rng)
+        exact = run_method(OneClassSVMWrapper(nu=args.nu), X_train, X_test)
+        approximate = run_method(
+            NystroemOneClassSVM(nu=args.nu, random_state=args.seed), X_train, X_test
+        )
+
+        for name, result in [
+            ("OneClassSVMWrapper", exact),
+            ("NystroemOneClassSVM", approximate),
+        ]:
+            precision, recall = precision_recall(result["predictions"], labels)
+            agreement = (result["predictions"] == exact["predictions"]).mean()
+            print(
+                f"{size:>8} {name:>22} {result['fit_seconds']:>9.3f} "
+                f"{result['predict_seconds'] * 1e6:>11.1f} {precision:>10.3f} "
+                f"{recall:>7.3f} {agreement:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
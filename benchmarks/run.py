@@ -0,0 +1,367 @@
+"""
+Benchmarks method fitting and scoring, preprocessing, end-to-end ticks and
+database writes on synthetic telemetry with stubbed providers, so it runs
+locally without hardware sensors.
+
+Results are written as JSON and compared against a stored baseline, and
+every metric that is worse than the baseline by more than the tolerance is
+reported as a regression (and makes the run exit with status 1). Baselines
+depend on the machine, so none is committed: store one with --save-baseline
+on the machine that runs the comparison, and pass --check to fail when it is
+missing instead of only warning.
+
+Usage:
+    python benchmarks/run.py                      # quick run
+    python benchmarks/run.py --full               # windows from 1k up to 1M rows
+    python benchmarks/run.py --save-baseline      # store the results as the baseline
+    python benchmarks/run.py --check              # fail without a baseline to compare against
+    python benchmarks/run.py --only methods tick  # run some of the suites
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+from typing import Callable
+
+import numpy as np
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from anomaly.synthetic import (
+    FEATURES,
+    SyntheticTelemetryGenerator,
+    install_stub_providers,
+)
+
+install_stub_providers()
+
+from anomaly.methods.zscore import ZScore
+from anomaly.methods.max_rule import MaxRule
+from anomaly.methods.average_rule import AverageRule
+from anomaly.methods.gaussian_mixture import GaussianMixtureWithThreshold
+from anomaly.methods.one_class_svm import OneClassSVMWrapper
+from anomaly.methods.nystroem_one_class_svm import NystroemOneClassSVM
+from anomaly.methods.half_space_trees import HalfSpaceTrees
+from anomaly.methods.mahalanobis import Mahalanobis
+from anomaly.preprocessing import DataPreprocessor
+from anomaly.module import AnomalyDetectionModule
+from anomaly.detector import Detector
+from anomaly.replay import SimulatedClock
+from anomaly import database
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+METHODS: dict[str, Callable] = {
+    "ZScore": lambda: ZScore(n=2, threshold=3.0),
+    "MaxRule": lambda: MaxRule(n=2, threshold=0.1),
+    "AverageRule": lambda: AverageRule(n=2, threshold=0.25),
+    "GaussianMixture": lambda: GaussianMixtureWithThreshold(
+        n_components=3, threshold=None
+    ),
+    "OneClassSVM": lambda: OneClassSVMWrapper(nu=0.01),
+    "NystroemOneClassSVM": lambda: NystroemOneClassSVM(nu=0.01, random_state=0),
+    "HalfSpaceTrees": lambda: HalfSpaceTrees(random_state=0),
+    "Mahalanobis": lambda: Mahalanobis(),
+}
+
+# Methods whose fit cost grows too fast to run on every window size.
+MAX_WINDOW_SIZES = {"OneClassSVM": 20000, "MaxRule": 100000, "AverageRule": 100000}
+
+QUICK_WINDOW_SIZES = [1000, 10000]
+FULL_WINDOW_SIZES = [1000, 10000, 100000, 1000000]
+FEATURE_COUNTS = [4, 19]
+PREDICT_SAMPLES = 200
+DB_BATCH_SIZE = 1000
+
+
+def make_matrix(n_samples: int, n_features: int, seed: int = 0) -> np.ndarray:
+    """
+    Returns synthetic samples of the first n_features features, normalized to
+    the [0, 1] range, as seen by the methods.
+    """
+    generator = SyntheticTelemetryGenerator(
+        FEATURES[:n_features], seed=seed, cumulative_counters=False
+    )
+    values, _ = generator.generate_array(n_samples)
+    min_values, max_values = values.min(axis=0), values.max(axis=0)
+    return (values - min_values) / np.where(
+        max_values > min_values, max_values - min_values, 1
+    )
+
+
+def make_telemetry(n_samples: int, seed: int = 0) -> list[dict]:
+    """
+    Returns raw synthetic telemetry records of every feature, as collected by the module.
+    """
+    generator = SyntheticTelemetryGenerator(seed=seed, cumulative_counters=False)
+    return generator.generate(n_samples).records
+
+
+class Results:
+    def __init__(self) -> None:
+        self.metrics: dict[str, dict] = {}
+
+    def add(
+        self,
+        name: str,
+        value: float,
+        unit: str,
+        higher_is_better: bool = False,
+        peak_memory_bytes: int = None,
+    ) -> None:
+        self.metrics[name] = {
+            "value": value,
+            "unit": unit,
+            "higher_is_better": higher_is_better,
+        }
+        if peak_memory_bytes is not None:
+            self.metrics[name]["peak_memory_bytes"] = peak_memory_bytes
+        print(f"{name:<55} {value:>14.6g} {unit}")
+
+    def to_dict(self) -> dict:
+        return {
+            "environment": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.machine(),
+                "processor": platform.processor(),
+            },
+            "metrics": self.metrics,
+        }
+
+
+def measure_peak_memory(function: Callable) -> int:
+    """
+    Returns the peak number of bytes allocated while running the function.
+    """
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure_seconds(function: Callable, repeat: int = 1) -> float:
+    """
+    Returns the best wall time of the function over the repeats.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_methods(results: Results, window_sizes: list[int]) -> None:
+    for name, make_method in METHODS.items():
+        for n_features in FEATURE_COUNTS:
+            for window_size in window_sizes:
+                if window_size > MAX_WINDOW_SIZES.get(name, window_size):
+                    continue
+
+                X = make_matrix(window_size, n_features, seed=0)
+                samples = make_matrix(PREDICT_SAMPLES, n_features, seed=1)
+                prefix = f"{name}/d={n_features}/n={window_size}"
+
+                peak_memory = measure_peak_memory(lambda: make_method().fit(X))
+                method = make_method()
+                repeat = 3 if window_size <= 10000 else 1
+                fit_seconds = measure_seconds(lambda: method.fit(X), repeat)
+                results.add(f"fit/{prefix}", fit_seconds, "s", False, peak_memory)
+
+                predict_seconds = measure_seconds(
+                    lambda: [method.predict(x) for x in samples], 3
+                )
+                results.add(
+                    f"predict/{prefix}", predict_seconds / PREDICT_SAMPLES, "s/sample"
+                )
+
+
+def bench_preprocessing(results: Results, window_sizes: list[int]) -> None:
+    preprocessor = DataPreprocessor(FEATURES)
+    for window_size in window_sizes:
+        telemetry = make_telemetry(window_size, seed=0)
+        repeat = 3 if window_size <= 10000 else 1
+
+        peak_memory = measure_peak_memory(lambda: preprocessor.normalize(telemetry))
+        seconds = measure_seconds(lambda: preprocessor.normalize(telemetry), repeat)
+        results.add(f"normalize/n={window_size}", seconds, "s", False, peak_memory)
+
+        peak_memory = measure_peak_memory(
+            lambda: preprocessor.normalize_array(telemetry)
+        )
+        seconds = measure_seconds(
+            lambda: preprocessor.normalize_array(telemetry), repeat
+        )
+        results.add(
+            f"normalize_array/n={window_size}", seconds, "s", False, peak_memory
+        )
+
+    samples = make_telemetry(PREDICT_SAMPLES, seed=1)
+    seconds = measure_seconds(
+        lambda: [preprocessor.normalize_single(t) for t in samples], 3
+    )
+    results.add("normalize_single", seconds / PREDICT_SAMPLES, "s/sample")
+    seconds = measure_seconds(
+        lambda: [preprocessor.normalize_single_array(t) for t in samples], 3
+    )
+    results.add("normalize_single_array", seconds / PREDICT_SAMPLES, "s/sample")
+
+
+def make_module(clock: SimulatedClock, **kwargs) -> AnomalyDetectionModule:
+    """
+    Returns a module monitoring every feature with the ensemble of the detection example.
+    """
+    module = AnomalyDetectionModule(
+        initial_learning_period_seconds=3600,
+        retraining_interval_seconds=10**9,
+        detection_threshold=2,
+        clock=clock,
+        **kwargs,
+    )
+    module.add_detector(Detector(ZScore(n=3, threshold=3.0), features=FEATURES[:8]))
+    module.add_detector(
+        Detector(
+            GaussianMixtureWithThreshold(n_components=3, threshold=None),
+            features=FEATURES[9:15],
+        )
+    )
+    module.add_detector(Detector(AverageRule(n=4), features=FEATURES[:4]))
+    module.add_detector(Detector(MaxRule(n=2), features=FEATURES[:9]))
+    module.add_detector(Detector(OneClassSVMWrapper(nu=0.01), features=FEATURES[:9]))
+    return module
+
+
+def bench_tick(results: Results) -> None:
+    """
+    Measures collection (with stubbed providers), normalization and the
+    detection of the whole ensemble for a single tick in the DETECTING state.
+    """
+    clock = SimulatedClock()
+    module = make_module(clock)
+    module.start()
+    while module.tick() is None:
+        clock.set(clock() + timedelta(seconds=5))
+
+    def run_ticks():
+        for _ in range(PREDICT_SAMPLES):
+            clock.set(clock() + timedelta(seconds=5))
+            module.tick()
+
+    seconds = measure_seconds(run_ticks, 3)
+    results.add("tick/detecting", seconds / PREDICT_SAMPLES, "s/tick")
+
+
+def bench_database(results: Results) -> None:
+    """
+    Measures write_telemetry_batch, which the ingest workers write every batch with.
+    """
+    telemetry = make_telemetry(DB_BATCH_SIZE)
+    with tempfile.TemporaryDirectory() as directory:
+        db_url = f"sqlite:///{os.path.join(directory, 'telemetry.db')}"
+        session_factory = database.init_db(db_url)
+        seconds = measure_seconds(
+            lambda: database.write_telemetry_batch(session_factory, telemetry), 3
+        )
+        results.add(
+            f"db/write_batch/n={DB_BATCH_SIZE}",
+            len(telemetry) / seconds,
+            "records/s",
+            True,
+        )
+        session_factory.kw["bind"].dispose()
+
+
+def compare(results: Results, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Returns the names of the metrics that regressed against the baseline.
+    """
+    regressions = []
+    for name, metric in results.metrics.items():
+        baseline_metric = baseline["metrics"].get(name)
+        if baseline_metric is None or baseline_metric["value"] == 0:
+            continue
+
+        ratio = metric["value"] / baseline_metric["value"]
+        if metric["higher_is_better"]:
+            ratio = 1 / ratio if ratio > 0 else float("inf")
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            print(f"REGRESSION {name}: {ratio:.2f}x worse than the baseline")
+    return regressions
+
+
+SUITES = {
+    "methods": lambda results, sizes: bench_methods(results, sizes),
+    "preprocessing": lambda results, sizes: bench_preprocessing(results, sizes),
+    "tick": lambda results, sizes: bench_tick(results),
+    "database": lambda results, sizes: bench_database(results),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--full", action="store_true")
+    parser.add_argument("--only", nargs="+", choices=list(SUITES), default=None)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="exit with status 2 when there is no baseline to compare against",
+    )
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    # The per-tick info logs would dominate the measured latencies.
+    logging.disable(logging.CRITICAL)
+
+    window_sizes = FULL_WINDOW_SIZES if args.full else QUICK_WINDOW_SIZES
+    results = Results()
+    for suite in args.only or SUITES:
+        SUITES[suite](results, window_sizes)
+
+    with open(args.output, "w") as f:
+        json.dump(results.to_dict(), f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results.to_dict(), f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(
+            f"WARNING: No baseline at {args.baseline}, regressions were NOT checked. "
+            "Store one with --save-baseline.",
+            file=sys.stderr,
+        )
+        if args.check:
+            sys.exit(2)
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if compare(results, baseline, args.tolerance):
+        sys.exit(1)
+    print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
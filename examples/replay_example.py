@@ -0,0 +1,76 @@
+import sys
+import os
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+
+from anomaly.methods.zscore import ZScore
+from anomaly.methods.max_rule import MaxRule
+from anomaly.methods.mahalanobis import Mahalanobis
+from anomaly.module import AnomalyDetectionModule
+from anomaly.detector import Detector
+from anomaly.replay import SimulatedClock, read_csv_telemetry, replay
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "notebooks", "data.csv")
+
+
+def main():
+    clock = SimulatedClock()
+    anomaly_module = AnomalyDetectionModule(
+        initial_learning_period_seconds=900,
+        retraining_interval_seconds=300,
+        detection_threshold=2,
+        monitored_features=[
+            "cpu_usage",
+            "cpu_temperature",
+            "ram_usage",
+            "disk_read_bytes",
+            "disk_write_bytes",
+            "network_bytes_sent",
+            "network_bytes_received",
+        ],
+        clock=clock,
+    )
+
+    anomaly_module.add_detector(
+        Detector(
+            method=ZScore(n=2, threshold=3.0),
+            features=[
+                "cpu_usage",
+                "disk_read_bytes",
+                "disk_write_bytes",
+                "network_bytes_sent",
+                "network_bytes_received",
+            ],
+        )
+    )
+    anomaly_module.add_detector(
+        Detector(
+            method=MaxRule(n=1, threshold=0.05),
+            features=["cpu_usage", "cpu_temperature", "ram_usage"],
+        )
+    )
+    anomaly_module.add_detector(
+        Detector(
+            method=Mahalanobis(regularization=1e-3),
+            features=["cpu_usage", "cpu_temperature", "ram_usage"],
+        )
+    )
+
+    # Replay the recorded telemetry as fast as possible on the simulated clock
+    telemetry_data = read_csv_telemetry(
+        DATA_PATH,
+        column_map={"disk_reads": "disk_read_bytes", "disk_writes": "disk_write_bytes"},
+    )
+    report = replay(anomaly_module, clock, telemetry_data)
+
+    print(report.summary())
+    for alert in report.alerts:
+        print(f"Anomaly detected at {alert}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import sys
+import os
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+
+from anomaly.collection import DEFAULT_FEATURE_SCHEDULES, MonitoredFeature
+from anomaly.methods.zscore import ZScore
+from anomaly.methods.mahalanobis import Mahalanobis
+from anomaly.module import AnomalyDetectionModule
+from anomaly.detector import Detector
+from anomaly.split_process import SplitProcessRunner
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+MONITORED_FEATURES: list[MonitoredFeature] = [
+    "cpu_usage",
+    "cpu_temperature",
+    "ram_usage",
+    "disk_read_bytes",
+    "disk_write_bytes",
+    "network_bytes_sent",
+    "network_bytes_received",
+    "total_threads_count",
+]
+
+
+def anomaly_callback(alert: dict) -> None:
+    logger.info(f"Anomaly detected: {alert}")
+
+
+def make_zscore_module(clock) -> AnomalyDetectionModule:
+    module = AnomalyDetectionModule(
+        initial_learning_period_seconds=900,
+        monitored_features=MONITORED_FEATURES,
+        alert_callback=anomaly_callback,
+        clock=clock,
+    )
+    module.add_detector(
+        Detector(method=ZScore(n=2, threshold=3.0), features=MONITORED_FEATURES)
+    )
+    return module
+
+
+def make_mahalanobis_module(clock) -> AnomalyDetectionModule:
+    module = AnomalyDetectionModule(
+        initial_learning_period_seconds=900,
+        monitored_features=MONITORED_FEATURES,
+        alert_callback=anomaly_callback,
+        clock=clock,
+    )
+    module.add_detector(Detector(method=Mahalanobis(), features=MONITORED_FEATURES))
+    return module
+
+
+def main():
+    # The collector samples on its own process, and each module scores in its own.
+    runner = SplitProcessRunner(
+        [make_zscore_module, make_mahalanobis_module],
+        MONITORED_FEATURES,
+        collection_interval_seconds=5,
+        feature_schedules=DEFAULT_FEATURE_SCHEDULES,
+    )
+    runner.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Hyperparameter sweep of the detection methods on a labeled dataset.
+
+Every method is fitted once per model configuration on the normal training
+part, every decision configuration (n, threshold, ...) is evaluated on the
+fitted model, and the configurations are printed ranked by F1 score with
+their fit and per-sample predict cost.
+
+The dataset is synthetic telemetry with injected anomalies by default, or a
+CSV file of telemetry with a label column. Counters are turned into rates.
+The hardware providers are replaced with synthetic ones, so the sweep runs on
+machines without sensors.
+
+Usage:
+    python scripts/detector_sweep.py
+    python scripts/detector_sweep.py --methods ZScore Mahalanobis --top 20
+    python scripts/detector_sweep.py --csv labeled.csv --label-column is_anomaly
+    python scripts/detector_sweep.py --grid grid.json --output results.csv
+
+A grid file maps method names to their grids, e.g.
+    {"ZScore": {"decision_grid": {"n": [1, 2], "threshold": [3, 4, 5]}}}
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from anomaly.synthetic import install_stub_providers
+
+# The sweep runs offline, so the hardware providers are never read.
+install_stub_providers()
+
+from anomaly.features import FeatureEngineer, Rate
+from anomaly.methods.average_rule import AverageRule
+from anomaly.methods.gaussian_mixture import GaussianMixtureWithThreshold
+from anomaly.methods.half_space_trees import HalfSpaceTrees
+from anomaly.methods.mahalanobis import Mahalanobis
+from anomaly.methods.max_rule import MaxRule
+from anomaly.methods.nystroem_one_class_svm import NystroemOneClassSVM
+from anomaly.methods.one_class_svm import OneClassSVMWrapper
+from anomaly.methods.seasonal_baseline import SeasonalBaseline
+from anomaly.methods.zscore import ZScore
+from anomaly.preprocessing import DataPreprocessor
+from anomaly.replay import read_csv_telemetry
+from anomaly.sweep import SweepGrid, sweep, to_frame
+from anomaly.synthetic import (
+    COUNTER_FEATURES,
+    FEATURE_MODELS,
+    SyntheticTelemetryGenerator,
+)
+
+METHODS: dict[str, type] = {
+    "ZScore": ZScore,
+    "MaxRule": MaxRule,
+    "AverageRule": AverageRule,
+    "GaussianMixture": GaussianMixtureWithThreshold,
+    "OneClassSVM": OneClassSVMWrapper,
+    "NystroemOneClassSVM": NystroemOneClassSVM,
+    "HalfSpaceTrees": HalfSpaceTrees,
+    "Mahalanobis": Mahalanobis,
+    "SeasonalBaseline": SeasonalBaseline,
+}
+
+DEFAULT_GRIDS: dict[str, dict] = {
+    "ZScore": {
+        "decision_grid": {"n": [1, 2, 3], "threshold": [2.0, 3.0, 4.0, 5.0, 6.0]}
+    },
+    "MaxRule": {"decision_grid": {"n": [1, 2], "threshold": [0.0, 0.05, 0.1, 0.25]}},
+    "GaussianMixture": {
+        "model_grid": {"n_components": [1, 2, 4, 8], "threshold": [None]},
+        "decision_grid": {"threshold": [-20.0, -10.0, 0.0, 5.0, 10.0]},
+    },
+    "NystroemOneClassSVM": {
+        "model_grid": {
+            "nu": [0.001, 0.01, 0.05],
+            "n_components": [50, 100, 200],
+            "max_samples": [5000],
+            "random_state": [0],
+        },
+    },
+    "HalfSpaceTrees": {
+        "model_grid": {
+            "n_trees": [25, 50],
+            "depth": [8, 10, 12],
+            "contamination": [0.001, 0.01],
+            "random_state": [0],
+        },
+    },
+    "Mahalanobis": {
+        "decision_grid": {"threshold": [20.0, 30.0, 40.0, 60.0, 100.0]},
+    },
+    "SeasonalBaseline": {
+        "model_grid": {"min_samples": [50, 100]},
+        "decision_grid": {"n": [1, 2, 3], "threshold": [3.0, 4.0, 5.0, 6.0]},
+    },
+}
+
+
+def make_synthetic_dataset(
+    days: float, seed: int
+) -> tuple[list[dict], np.ndarray, int]:
+    """
+    Returns a day of normal telemetry followed by telemetry with anomalies,
+    the labels and the number of training records.
+    """
+    interval_seconds = 5
+    n_train = int(86400 / interval_seconds)
+    n_samples = n_train + int(days * 86400 / interval_seconds)
+    generator = SyntheticTelemetryGenerator(
+        interval_seconds=interval_seconds, seed=seed
+    )
+    anomalies = generator.random_anomalies(
+        n_samples, n_anomalies=int(days * 20), start_after=n_train
+    )
+    telemetry = generator.generate(n_samples, anomalies)
+    return telemetry.records, telemetry.labels, n_train
+
+
+def make_csv_dataset(
+    path: str, label_column: str, train_fraction: float
+) -> tuple[list[dict], np.ndarray, int]:
+    records = list(read_csv_telemetry(path))
+    labels = np.array([bool(record.pop(label_column)) for record in records])
+    return records, labels, int(len(records) * train_fraction)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--methods", nargs="+", default=list(DEFAULT_GRIDS))
+    parser.add_argument("--grid", help="a JSON file with the grids of the methods")
+    parser.add_argument("--csv", help="labeled telemetry, synthetic by default")
+    parser.add_argument("--label-column", default="label")
+    parser.add_argument("--train-fraction", type=float, default=0.5)
+    parser.add_argument("--days", type=float, default=2, help="of synthetic test data")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=30)
+    parser.add_argument("--output", help="write every result to a CSV file")
+    args = parser.parse_args()
+
+    grids = DEFAULT_GRIDS
+    if args.grid:
+        with open(args.grid) as f:
+            grids = json.load(f)
+
+    if args.csv:
+        records, labels, n_train = make_csv_dataset(
+            args.csv, args.label_column, args.train_fraction
+        )
+    else:
+        records, labels, n_train = make_synthetic_dataset(args.days, args.seed)
+
+    features = [feature for feature in records[0] if feature in FEATURE_MODELS]
+    rates = [Rate(feature) for feature in features if feature in COUNTER_FEATURES]
+    feature_engineer = FeatureEngineer(rates)
+    records = [feature_engineer.transform(record) for record in records]
+    features = [f for f in features if f not in COUNTER_FEATURES] + [
+        rate.name for rate in rates
+    ]
+
+    # Like the module, train on the normal records only and normalize with their ranges.
+    preprocessor = DataPreprocessor(features)
+    train_records = [r for r, l in zip(records[:n_train], labels[:n_train]) if not l]
+    X_train = preprocessor.normalize_array(train_records)
+    X_test = np.array(
+        [preprocessor.normalize_single_array(record) for record in records[n_train:]]
+    )
+    y_test = labels[n_train:]
+
+    sweep_grids = [
+        SweepGrid(
+            METHODS[name],
+            grids.get(name, {}).get("model_grid", {}),
+            grids.get(name, {}).get("decision_grid", {}),
+        )
+        for name in args.methods
+    ]
+    print(
+        f"Sweeping {', '.join(args.methods)} on {len(X_train)} training and "
+        f"{len(X_test)} test samples ({int(y_test.sum())} anomalous) "
+        f"with {len(features)} features."
+    )
+    started = time.perf_counter()
+    results = sweep(
+        sweep_grids,
+        X_train,
+        X_test,
+        y_test,
+        n_workers=args.workers,
+        timestamps_train=[record["timestamp"] for record in train_records],
+        timestamps_test=[record["timestamp"] for record in records[n_train:]],
+    )
+    print(
+        f"Evaluated {len(results)} configurations in {time.perf_counter() - started:.1f}s."
+    )
+
+    frame = to_frame(results)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(frame.head(args.top).to_string(index=False, float_format="{:.4g}".format))
+    if args.output:
+        frame.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Load generator for the telemetry ingest server.
+
+Simulates many agents pushing samples over a few TCP connections and reports
+the send rate. With --serve, a local ingest server is started first and the
+rate at which its workers process the samples is reported as well. The
+hardware providers are replaced with synthetic ones, so it runs on machines
+without sensors.
+
+Usage:
+    python scripts/ingest_load_generator.py --serve --hosts 500 --duration 10
+    python scripts/ingest_load_generator.py --port 9500 --hosts 200 --rate 2000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Callable
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from anomaly.synthetic import install_stub_providers
+
+# The samples come from the simulated agents, so the hardware providers are never read.
+install_stub_providers()
+
+from anomaly.collection import MonitoredFeature
+from anomaly.detector import Detector
+from anomaly.ingest import IngestServer, encode_sample
+from anomaly.methods.zscore import ZScore
+from anomaly.module import AnomalyDetectionModule
+
+MONITORED_FEATURES: list[MonitoredFeature] = [
+    "cpu_usage",
+    "ram_usage",
+    "disk_read_bytes",
+    "disk_write_bytes",
+    "network_bytes_sent",
+    "network_bytes_received",
+]
+SAMPLE_INTERVAL_SECONDS = 5
+
+
+def make_module(host_id: str, clock: Callable[[], datetime]) -> AnomalyDetectionModule:
+    module = AnomalyDetectionModule(
+        initial_learning_period_seconds=300,
+        retraining_interval_seconds=900,
+        monitored_features=MONITORED_FEATURES,
+        clock=clock,
+    )
+    module.add_detector(
+        Detector(method=ZScore(n=2, threshold=3.0), features=MONITORED_FEATURES)
+    )
+    return module
+
+
+async def run_connection(
+    host: str,
+    port: int,
+    host_ids: list[str],
+    rate: float,
+    duration: float,
+    sent: list[int],
+) -> None:
+    """
+    Sends samples of the given hosts round-robin, at the given rate (0 for as
+    fast as the server accepts them), with timestamps advancing by the
+    sample interval so the modules move through their learning period.
+    """
+    _, writer = await asyncio.open_connection(host, port)
+    timestamp = time.time()
+    batch_size = 100
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        frames = []
+        for _ in range(batch_size):
+            host_id = host_ids[sent[0] % len(host_ids)]
+            if sent[0] % len(host_ids) == 0:
+                timestamp += SAMPLE_INTERVAL_SECONDS
+            values = [random.random() for _ in MONITORED_FEATURES]
+            frames.append(encode_sample(host_id, timestamp, values))
+            sent[0] += 1
+        writer.write(b"".join(frames))
+        await writer.drain()
+
+        if rate > 0:
+            expected_elapsed = sent[0] / rate
+            await asyncio.sleep(
+                max(0.0, expected_elapsed - (time.perf_counter() - started))
+            )
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run(args: argparse.Namespace) -> None:
+    server = None
+    port = args.port
+    if args.serve:
+        server = IngestServer(
+            make_module,
+            MONITORED_FEATURES,
+            port=0,
+            n_workers=args.workers,
+        )
+        await server.start()
+        port = server.port
+
+    host_ids = [f"host-{i}" for i in range(args.hosts)]
+    counters = [[0] for _ in range(args.connections)]
+    started = time.perf_counter()
+    await asyncio.gather(
+        *[
+            run_connection(
+                args.host,
+                port,
+                host_ids[i :: args.connections],
+                args.rate / args.connections,
+                args.duration,
+                counters[i],
+            )
+            for i in range(args.connections)
+        ]
+    )
+    sent = sum(counter[0] for counter in counters)
+    elapsed = time.perf_counter() - started
+    print(f"Sent {sent} samples in {elapsed:.2f}s ({sent / elapsed:.0f} samples/sec)")
+
+    if server is not None:
+        # Give the server time to drain everything still buffered in the sockets.
+        await server.stop(timeout_seconds=600)
+        elapsed = time.perf_counter() - started
+        print(
+            f"Processed {server.processed} samples in {elapsed:.2f}s "
+            f"({server.processed / elapsed:.0f} samples/sec)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9500)
+    parser.add_argument("--hosts", type=int, default=100)
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=0, help="0 sends flat out")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--serve", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
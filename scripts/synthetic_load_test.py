@@ -0,0 +1,167 @@
+"""
+Offline load test of the anomaly detection module on synthetic telemetry.
+
+Every simulated host gets its own seeded telemetry with labeled anomalies and
+its own module, replayed on a simulated clock as fast as possible. The hosts
+are spread over worker processes, and the run reports the throughput, the
+detection latency and the precision and recall of the alerts.
+
+Usage:
+    python scripts/synthetic_load_test.py --hosts 8 --days 7
+    python scripts/synthetic_load_test.py --hosts 64 --workers 8 --anomalies 40
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from anomaly.synthetic import install_stub_providers
+
+# The telemetry is generated, so the hardware providers are never called. Stubs
+# keep the run offline on machines without their dependencies.
+install_stub_providers()
+
+from anomaly.collection import MonitoredFeature
+from anomaly.detector import Detector
+from anomaly.features import Rate
+from anomaly.methods.mahalanobis import Mahalanobis
+from anomaly.methods.zscore import ZScore
+from anomaly.module import AnomalyDetectionModule
+from anomaly.replay import SimulatedClock, replay
+from anomaly.synthetic import (
+    COUNTER_FEATURES,
+    DetectionMetrics,
+    SyntheticTelemetryGenerator,
+    evaluate_detections,
+)
+from anomaly.training_set import ReservoirTrainingSet
+
+MONITORED_FEATURES: list[MonitoredFeature] = [
+    "cpu_usage",
+    "cpu_temperature",
+    "ram_usage",
+    "gpu_usage",
+    "disk_read_bytes",
+    "disk_write_bytes",
+    "network_bytes_sent",
+    "network_bytes_received",
+    "network_total_active_connections",
+    "total_processes_count",
+]
+SAMPLE_INTERVAL_SECONDS = 5
+# A full day of learning, so the models have seen the daily cycle.
+LEARNING_PERIOD_SECONDS = 24 * 3600
+
+
+def make_module(clock: SimulatedClock) -> AnomalyDetectionModule:
+    rates = [
+        Rate(feature) for feature in MONITORED_FEATURES if feature in COUNTER_FEATURES
+    ]
+    # The detectors see the rates of the counters instead of their running totals.
+    features = [
+        feature for feature in MONITORED_FEATURES if feature not in COUNTER_FEATURES
+    ] + [rate.name for rate in rates]
+
+    module = AnomalyDetectionModule(
+        initial_learning_period_seconds=LEARNING_PERIOD_SECONDS,
+        retraining_interval_seconds=6 * 3600,
+        collection_interval_seconds=SAMPLE_INTERVAL_SECONDS,
+        detection_threshold=1,
+        monitored_features=MONITORED_FEATURES,
+        clock=clock,
+        derived_features=rates,
+        # Training on the whole history covers the daily cycle, a FIFO would only see the last hours.
+        training_set=ReservoirTrainingSet(max_size=5000, random_state=0),
+    )
+    module.add_detector(Detector(method=ZScore(n=1, threshold=6.0), features=features))
+    module.add_detector(
+        Detector(method=Mahalanobis(confidence=0.99999), features=features)
+    )
+    return module
+
+
+def run_host(
+    seed: int, n_samples: int, n_anomalies: int
+) -> tuple[int, float, DetectionMetrics]:
+    """
+    Replays the synthetic telemetry of one host and returns the number of
+    samples, the replay time and the detection metrics.
+    """
+    generator = SyntheticTelemetryGenerator(
+        features=MONITORED_FEATURES,
+        interval_seconds=SAMPLE_INTERVAL_SECONDS,
+        seed=seed,
+    )
+    # Leave the first retraining after the initial learning undisturbed.
+    learning_samples = LEARNING_PERIOD_SECONDS // SAMPLE_INTERVAL_SECONDS + 2
+    anomalies = generator.random_anomalies(
+        n_samples, n_anomalies, start_after=learning_samples
+    )
+    telemetry = generator.generate(n_samples, anomalies)
+
+    clock = SimulatedClock()
+    report = replay(make_module(clock), clock, telemetry.records)
+    decisions = [tick.is_anomaly for tick in report.ticks]
+    return n_samples, report.elapsed_seconds, evaluate_detections(decisions, telemetry)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--hosts", type=int, default=4)
+    parser.add_argument("--days", type=float, default=3)
+    parser.add_argument("--anomalies", type=int, default=20, help="per host")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    n_samples = int(args.days * 86400 / SAMPLE_INTERVAL_SECONDS)
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        results = list(
+            executor.map(
+                run_host,
+                range(args.seed, args.seed + args.hosts),
+                [n_samples] * args.hosts,
+                [args.anomalies] * args.hosts,
+            )
+        )
+    elapsed = time.perf_counter() - started
+
+    total_samples = sum(samples for samples, _, _ in results)
+    replay_seconds = sum(seconds for _, seconds, _ in results)
+    metrics = sum(
+        (result for _, _, result in results), DetectionMetrics(0, 0, 0, 0, [])
+    )
+
+    print(
+        f"Replayed {total_samples} samples of {args.hosts} hosts in {elapsed:.2f}s "
+        f"({total_samples / elapsed:.0f} samples/sec, "
+        f"{total_samples / replay_seconds:.0f} samples/sec per worker)"
+    )
+    print(
+        f"Precision {metrics.precision:.3f} "
+        f"({metrics.true_alerts} true, {metrics.false_alerts} false alerts), "
+        f"recall {metrics.recall:.3f} "
+        f"({metrics.detected_events} of {metrics.total_events} anomalies)"
+    )
+    if metrics.latencies_seconds:
+        latencies = np.array(metrics.latencies_seconds)
+        print(
+            f"Detection latency: median {np.median(latencies):.1f}s, "
+            f"p95 {np.percentile(latencies, 95):.1f}s, max {latencies.max():.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
-from typing import Literal, Callable, Any
+from datetime import datetime
+from typing import Literal, Callable, Any, NamedTuple, Optional
 
 from .providers.cpu import get_cpu_usage, get_cpu_speed, get_cpu_temperature
 from .providers.gpu import get_gpu_usage, get_gpu_temperature, get_vram_usage
@@ -61,3 +62,138 @@ MonitoredFeatureCollector: dict[MonitoredFeature, Callable[[], Any]] = {
     "total_threads_count": get_total_threads_count,
     "total_handles_count": get_total_handles_count,
 }
+
+
+class FeatureSchedule(NamedTuple):
+    """
+    How often a feature is collected and the relative cost of collecting it.
+
+    A period of 0 collects the feature on every tick.
+    """
+
+    period_seconds: float
+    cost: float = 1.0
+
+
+# Temperatures and fan speeds move slowly and open a LibreHardwareMonitor
+# session per call, the process and connection counts walk every process.
+DEFAULT_FEATURE_SCHEDULES: dict[MonitoredFeature, FeatureSchedule] = {
+    "cpu_usage": FeatureSchedule(0),
+    "cpu_speed": FeatureSchedule(0),
+    "cpu_temperature": FeatureSchedule(30, cost=10),
+    "cpu_fan_speed": FeatureSchedule(30, cost=10),
+    "ram_usage": FeatureSchedule(0),
+    "vram_usage": FeatureSchedule(15, cost=5),
+    "gpu_usage": FeatureSchedule(0, cost=5),
+    "gpu_temperature": FeatureSchedule(30, cost=10),
+    "gpu_fan_speed": FeatureSchedule(30, cost=10),
+    "disk_read_bytes": FeatureSchedule(0),
+    "disk_write_bytes": FeatureSchedule(0),
+    "network_bytes_sent": FeatureSchedule(0),
+    "network_bytes_received": FeatureSchedule(0),
+    "network_packets_sent": FeatureSchedule(0),
+    "network_packets_received": FeatureSchedule(0),
+    "network_total_active_connections": FeatureSchedule(60, cost=20),
+    "total_processes_count": FeatureSchedule(30, cost=2),
+    "total_threads_count": FeatureSchedule(60, cost=50),
+    "total_handles_count": FeatureSchedule(60, cost=50),
+}
+
+
+class ScheduledCollector:
+    """
+    Collects only the features that are due on a tick and carries the last
+    value of the others forward, so every record still has every feature.
+
+    The age in seconds of every value is stored under the "feature_ages" key.
+    Due features are refreshed most overdue first until the cost budget of the
+    tick is spent, the rest stay due for the next tick. The most overdue feature
+    is refreshed even when it does not fit the budget, so no feature starves.
+    Features collected on every tick and features without a value yet are
+    always collected.
+    """
+
+    def __init__(
+        self,
+        monitored_features: list[MonitoredFeature],
+        schedules: dict[MonitoredFeature, FeatureSchedule],
+        cost_budget: Optional[float] = None,
+        collectors: dict[
+            MonitoredFeature, Callable[[], Any]
+        ] = MonitoredFeatureCollector,
+    ) -> None:
+        """
+        :param schedules: The schedule of every feature, features without one are collected on every tick.
+        :param cost_budget: The highest total cost of the scheduled features refreshed on one tick.
+        """
+        if cost_budget is not None:
+            over_budget = [
+                feature
+                for feature in monitored_features
+                if feature in schedules
+                and schedules[feature].period_seconds > 0
+                and schedules[feature].cost > cost_budget
+            ]
+            if over_budget:
+                raise ValueError(
+                    f"Features {over_budget} cost more than the cost budget "
+                    f"{cost_budget} of a tick, so they would never be refreshed."
+                )
+
+        self._monitored_features = monitored_features
+        self._schedules = {
+            feature: schedules.get(feature, FeatureSchedule(0))
+            for feature in monitored_features
+        }
+        self._cost_budget = cost_budget
+        self._collectors = collectors
+        self._last_values: dict[MonitoredFeature, Any] = {}
+        self._last_collection_times: dict[MonitoredFeature, datetime] = {}
+
+    def collect(self, timestamp: datetime) -> dict:
+        """
+        Returns the telemetry of the tick at the given time.
+        """
+        required = []
+        overdue = []
+        for feature in self._monitored_features:
+            schedule = self._schedules[feature]
+            last_collection_time = self._last_collection_times.get(feature)
+            if schedule.period_seconds <= 0 or last_collection_time is None:
+                required.append(feature)
+                continue
+
+            age_seconds = (timestamp - last_collection_time).total_seconds()
+            if age_seconds >= schedule.period_seconds:
+                overdue.append((age_seconds / schedule.period_seconds, feature))
+
+        due = required
+        spent = 0.0
+        overdue.sort(key=lambda item: item[0], reverse=True)
+        for rank, (_, feature) in enumerate(overdue):
+            cost = self._schedules[feature].cost
+            if (
+                rank > 0
+                and self._cost_budget is not None
+                and spent + cost > self._cost_budget
+            ):
+                continue
+            spent += cost
+            due.append(feature)
+
+        for feature in due:
+            self._last_values[feature] = self._collectors[feature]()
+            self._last_collection_times[feature] = timestamp
+
+        telemetry_data = {"timestamp": timestamp}
+        for feature in self._monitored_features:
+            telemetry_data[feature] = self._last_values[feature]
+        telemetry_data["feature_ages"] = {
+            feature: (timestamp - self._last_collection_times[feature]).total_seconds()
+            for feature in self._monitored_features
+        }
+        return telemetry_data
+
+    def reset(self) -> None:
+        self._last_values.clear()
+        self._last_collection_times.clear()
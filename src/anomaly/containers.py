@@ -0,0 +1,177 @@
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import numpy as np
+
+from .engine import EntityEngine, StackedZScore, grow_rows
+from .providers.cgroup import (
+    CGROUP_COUNTER_FEATURES,
+    CGROUP_FEATURES,
+    CgroupStatsReader,
+)
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+_COUNTER_MASK = np.array(
+    [feature in CGROUP_COUNTER_FEATURES for feature in CGROUP_FEATURES]
+)
+
+# The counters are scored by their rate per second.
+CONTAINER_FEATURES = [
+    f"{feature}_rate" if feature in CGROUP_COUNTER_FEATURES else feature
+    for feature in CGROUP_FEATURES
+]
+
+
+class ContainerMonitor:
+    """
+    Detects anomalies of every container on the node, with a z-score model per
+    container.
+
+    The models are the slots of an EntityEngine instead of one object per
+    container, so a tick updates and scores every container with a few NumPy
+    operations. Every container learns for learning_period_seconds after it
+    first appears, and its model keeps following the samples that are not
+    anomalies afterwards. The rows of containers that stop are reused.
+    """
+
+    def __init__(
+        self,
+        reader: Optional[CgroupStatsReader] = None,
+        learning_period_seconds: float = 3600,
+        collection_interval_seconds: float = 5,
+        n: int = 1,
+        threshold: float = 4.0,
+        alert_callback: Optional[Callable[[str, dict], None]] = None,
+        clock: Optional[Callable[[], datetime]] = None,
+        initial_capacity: int = 64,
+    ) -> None:
+        """
+        :param n: The number of features whose z-score must exceed the threshold.
+        :param alert_callback: Called with the container id and its features for every anomaly.
+        """
+        self._reader = reader or CgroupStatsReader()
+        self._learning_period_seconds = learning_period_seconds
+        self._collection_interval_seconds = collection_interval_seconds
+        self._alert_callback = alert_callback
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+
+        self._engine = EntityEngine(
+            StackedZScore(n, threshold), len(CGROUP_FEATURES), initial_capacity
+        )
+        self._last_values = np.empty((0, len(CGROUP_FEATURES)))
+        self._last_times = np.empty(0)
+        self._first_times = np.empty(0)
+        self._grow(self._engine.capacity)
+
+    @property
+    def collection_interval_seconds(self) -> float:
+        return self._collection_interval_seconds
+
+    @property
+    def containers(self) -> list[str]:
+        return self._engine.entities
+
+    def process(self) -> None:
+        self.start()
+        while True:
+            started = time.monotonic()
+            self.tick()
+            time.sleep(
+                max(self._collection_interval_seconds - (time.monotonic() - started), 0)
+            )
+
+    def start(self) -> None:
+        logger.info("Container monitoring started.")
+
+    def tick(self) -> list[str]:
+        """
+        Reads the statistics of every container and returns the anomalous ones.
+        """
+        container_ids, values = self._reader.read()
+        return self.step(self._clock(), container_ids, values)
+
+    def step(
+        self, timestamp: datetime, container_ids: list[str], values: np.ndarray
+    ) -> list[str]:
+        """
+        Updates and scores the containers with their CGROUP_FEATURES values
+        at the given time, and returns the ids of the anomalous ones.
+        """
+        now = timestamp.timestamp()
+        self._remove_stopped(set(container_ids))
+        rows = np.array(
+            [self._get_row(container_id, now) for container_id in container_ids],
+            dtype=np.intp,
+        )
+        if len(rows) == 0:
+            return []
+
+        elapsed_seconds = now - self._last_times[rows]
+        increments = (
+            values[:, _COUNTER_MASK] - self._last_values[rows][:, _COUNTER_MASK]
+        )
+        # A container seen for the first time, or whose counters were reset, has no rates yet.
+        has_rates = (
+            np.isfinite(elapsed_seconds)
+            & (elapsed_seconds > 0)
+            & np.all(increments >= 0, axis=1)
+        )
+
+        features = values.copy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            features[:, _COUNTER_MASK] = increments / elapsed_seconds[:, None]
+        self._last_values[rows] = values
+        self._last_times[rows] = now
+
+        rows, features = rows[has_rates], features[has_rates]
+        container_indices = np.flatnonzero(has_rates)
+        is_learning = now - self._first_times[rows] < self._learning_period_seconds
+        is_anomaly = ~is_learning & (self._engine.predict(rows, features) > 0)
+        self._engine.update(rows[~is_anomaly], features[~is_anomaly])
+
+        anomalies = []
+        for index in np.flatnonzero(is_anomaly):
+            container_id = container_ids[container_indices[index]]
+            anomalies.append(container_id)
+            logger.info(f"Anomaly detected in container {container_id} at {timestamp}.")
+            if self._alert_callback:
+                self._alert_callback(
+                    container_id,
+                    {
+                        "timestamp": timestamp,
+                        **dict(zip(CONTAINER_FEATURES, features[index].tolist())),
+                    },
+                )
+        return anomalies
+
+    def _get_row(self, container_id: str, now: float) -> int:
+        if container_id in self._engine:
+            return self._engine.add(container_id)
+
+        row = self._engine.add(container_id)
+        if self._engine.capacity > len(self._first_times):
+            self._grow(self._engine.capacity)
+        self._first_times[row] = now
+        logger.info(f"Started monitoring container {container_id}.")
+        return row
+
+    def _remove_stopped(self, container_ids: set[str]) -> None:
+        for container_id in [
+            c for c in self._engine.entities if c not in container_ids
+        ]:
+            row = self._engine.remove(container_id)
+            self._last_values[row] = np.nan
+            self._last_times[row] = np.nan
+            self._first_times[row] = np.nan
+            logger.info(f"Stopped monitoring container {container_id}.")
+
+    def _grow(self, capacity: int) -> None:
+        """
+        Grows the rate and learning state to the capacity of the engine.
+        """
+        self._last_values = grow_rows(self._last_values, capacity, np.nan)
+        self._last_times = grow_rows(self._last_times, capacity, np.nan)
+        self._first_times = grow_rows(self._first_times, capacity, np.nan)
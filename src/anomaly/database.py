@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 from sqlalchemy import create_engine, Column, Integer, DateTime, Text
 from sqlalchemy.ext.declarative import declarative_base
@@ -23,3 +24,36 @@ def init_db(db_url: str):
     Base.metadata.create_all(engine)
     Session = sessionmaker(bind=engine)
     return Session
+
+
+def serialize_telemetry(telemetry_data: dict) -> str:
+    """
+    Serializes a telemetry record into the JSON stored in TelemetryData.data.
+    """
+    return json.dumps(
+        telemetry_data,
+        default=lambda o: o.isoformat() if hasattr(o, "isoformat") else o,
+    )
+
+
+def write_telemetry_batch(session_factory, telemetry_data: list[dict]) -> None:
+    """
+    Writes telemetry records into the database in a single transaction.
+    """
+    session = session_factory()
+    try:
+        session.add_all(
+            [
+                TelemetryData(
+                    timestamp=telemetry["timestamp"],
+                    data=serialize_telemetry(telemetry),
+                )
+                for telemetry in telemetry_data
+            ]
+        )
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
@@ -1,5 +1,12 @@
+from datetime import datetime
+from typing import Optional, Sequence, Union
+
 from .collection import MonitoredFeature
+from .projection import PCAProjection
 import numpy as np
+from logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class Detector:
@@ -8,21 +15,62 @@ class Detector:
         method,
         predict_transform=None,
         features: list[MonitoredFeature] = [],
+        projection: Optional[PCAProjection] = None,
     ) -> None:
         """
-        :param method: An anomaly detection method that supports .fit() and .predict()
+        :param method: An anomaly detection method that supports .fit() and .predict().
+                       Methods with uses_timestamps set are also passed the timestamp
+                       of every sample.
         :param predict_transform: An optional function to transform the raw prediction
                                   into a probability or score. If None, the raw prediction is returned.
+        :param projection: An optional projection of the features, such as onto their principal
+                           components, which is refitted with the method and applied to every
+                           sample before the method sees it.
         """
         self._method = method
         self._predict_transform = predict_transform or (lambda x: x)
         self._features = features
+        self._projection = projection
+        self._score_baseline: Optional[float] = None
+        self._columns: Union[slice, np.ndarray, None] = None
+
+    def compile(self, feature_index: dict[MonitoredFeature, int]) -> None:
+        """
+        Precompute the columns of the shared telemetry row that this detector reads.
+
+        :param feature_index: The column index of every feature in the shared row.
+        """
+        missing_features = [f for f in self._features if f not in feature_index]
+        if missing_features:
+            raise ValueError(
+                f"Detector features {missing_features} are not monitored by the module."
+            )
+
+        columns = np.array([feature_index[f] for f in self._features], dtype=np.intp)
+        first_column = int(columns[0]) if len(columns) > 0 else 0
+        if np.array_equal(
+            columns, np.arange(first_column, first_column + len(columns))
+        ):
+            # Contiguous columns are read through a slice, which is a zero-copy view.
+            self._columns = slice(first_column, first_column + len(columns))
+        else:
+            self._columns = columns
 
     def fit(self, data: list[dict]) -> None:
         """Fit the detection method with the provided data."""
         train_data = [[d[feature] for feature in self._features] for d in data]
-        numpy_data = np.array(train_data)
-        self._method.fit(numpy_data)
+        numpy_data = self._fit_projection(np.array(train_data))
+        timestamps = [d.get("timestamp") for d in data]
+        self._method.fit(numpy_data, *self._timestamp_args(timestamps))
+        self._fit_score_baseline(numpy_data, timestamps)
+
+    def fit_array(
+        self, data: np.ndarray, timestamps: Optional[Sequence[datetime]] = None
+    ) -> None:
+        """Fit the detection method with the columns of the compiled features."""
+        data = self._fit_projection(data[:, self._get_columns()])
+        self._method.fit(data, *self._timestamp_args(timestamps))
+        self._fit_score_baseline(data, timestamps)
 
     def predict(self, data_point: dict) -> float:
         """
@@ -31,9 +79,114 @@ class Detector:
         """
         test_data_point = [data_point[feature] for feature in self._features]
         numpy_data_point = np.array(test_data_point)
-        raw_prediction = self._method.predict(numpy_data_point)
+        raw_prediction = self._method.predict(
+            self._project(numpy_data_point),
+            *self._timestamp_args(data_point.get("timestamp")),
+        )
         return self._predict_transform(raw_prediction)
 
+    def predict_array(
+        self, row: np.ndarray, timestamp: Optional[datetime] = None
+    ) -> float:
+        """
+        Return a transformed prediction value for a row of the shared telemetry array.
+        """
+        raw_prediction = self._method.predict(
+            self._project(row[self._get_columns()]), *self._timestamp_args(timestamp)
+        )
+        return self._predict_transform(raw_prediction)
+
+    def update_array(
+        self, row: np.ndarray, timestamp: Optional[datetime] = None
+    ) -> None:
+        """
+        Feed a row of the shared telemetry array to methods that learn incrementally.
+        Methods without an .update() hook are left untouched.
+        """
+        if hasattr(self._method, "update"):
+            self._method.update(
+                self._project(row[self._get_columns()]),
+                *self._timestamp_args(timestamp),
+            )
+
+    def score_ratio(
+        self, row: np.ndarray, timestamp: Optional[datetime] = None
+    ) -> Optional[float]:
+        """
+        Returns how far the anomaly score of a row of the shared telemetry array
+        has moved from the median training score towards the threshold of the
+        method: 0 at the median, 1 at the threshold and above 1 past it.
+
+        Returns None for methods without .anomaly_scores() and .score_threshold.
+        """
+        if self._score_baseline is None:
+            return None
+
+        score = self._method.anomaly_scores(
+            self._project(row[self._get_columns()])[None, :],
+            *self._timestamp_args(None if timestamp is None else [timestamp]),
+        )[0]
+        distance = self._method.score_threshold - self._score_baseline
+        if distance <= 0:
+            return float(score > self._method.score_threshold)
+        return max(float((score - self._score_baseline) / distance), 0.0)
+
     def get_name(self) -> str:
         """Return the name of the detection method."""
         return self._method.__class__.__name__
+
+    def _fit_score_baseline(
+        self, data: np.ndarray, timestamps: Optional[Sequence[datetime]]
+    ) -> None:
+        """
+        Stores the median anomaly score of the training data, the reference of score_ratio().
+        """
+        if not (
+            hasattr(self._method, "anomaly_scores")
+            and hasattr(self._method, "score_threshold")
+        ):
+            return
+
+        # A thousand evenly spaced samples estimate the median well enough.
+        step = max(len(data) // 1000, 1)
+        timestamp_args = self._timestamp_args(
+            None if timestamps is None else list(timestamps)[::step]
+        )
+        scores = self._method.anomaly_scores(data[::step], *timestamp_args)
+        self._score_baseline = float(np.median(scores))
+
+    def _fit_projection(self, data: np.ndarray) -> np.ndarray:
+        """
+        Refits the projection on the training data and returns the data projected.
+        """
+        if self._projection is None:
+            return data
+
+        self._projection.fit(data)
+        logger.info(
+            f"{self.get_name()} projects {data.shape[1]} features onto "
+            f"{len(self._projection.components)} components explaining "
+            f"{self._projection.explained_variance_ratio.sum():.1%} of the variance."
+        )
+        return self._projection.transform(data)
+
+    def _project(self, data: np.ndarray) -> np.ndarray:
+        if self._projection is None:
+            return data
+        return self._projection.transform(data)
+
+    def _timestamp_args(self, timestamps) -> tuple:
+        """
+        Returns the timestamp arguments of a method call, which are only passed
+        to methods that use timestamps.
+        """
+        if not getattr(self._method, "uses_timestamps", False):
+            return ()
+        if timestamps is None:
+            raise ValueError(f"{self.get_name()} needs the timestamps of the samples.")
+        return (timestamps,)
+
+    def _get_columns(self) -> Union[slice, np.ndarray]:
+        if self._columns is None:
+            raise Exception("Detector must be compiled before using the shared array.")
+        return self._columns
@@ -0,0 +1,83 @@
+from collections import deque
+
+import numpy as np
+
+
+class DriftMonitor:
+    """
+    Tracks the Population Stability Index of every feature between the training
+    snapshot and a sliding window of live samples.
+
+    The bin edges are the quantiles of the training data, and the live bin
+    counts are updated in O(features) per sample as samples enter and leave
+    the window, so checking for drift stays cheap on every tick.
+    """
+
+    _EPSILON = 1e-4
+
+    def __init__(
+        self, threshold: float = 0.2, window_size: int = 500, n_bins: int = 10
+    ) -> None:
+        """
+        :param threshold: The PSI above which a feature has drifted, 0.1 is commonly
+                          read as a moderate and 0.2 as a significant shift.
+        :param window_size: The number of live samples compared with the training snapshot,
+                            no drift is reported before the window is full.
+        :param n_bins: The number of quantile bins of every feature.
+        """
+        self.threshold = threshold
+        self.window_size = window_size
+        self.n_bins = n_bins
+
+    def fit(self, X: np.ndarray) -> None:
+        """
+        Takes the training data as the reference distribution and empties the window.
+        """
+        quantiles = np.linspace(0, 1, self.n_bins + 1)[1:-1]
+        self._edges = np.quantile(X, quantiles, axis=0).T
+        expected_counts = np.zeros((X.shape[1], self.n_bins))
+        bins = self._get_bins(X)
+        for feature in range(X.shape[1]):
+            expected_counts[feature] = np.bincount(
+                bins[:, feature], minlength=self.n_bins
+            )
+        self._expected = np.maximum(expected_counts / len(X), self._EPSILON)
+        self._features = np.arange(X.shape[1])
+        self._counts = np.zeros((X.shape[1], self.n_bins), dtype=np.int64)
+        self._window: deque[np.ndarray] = deque()
+
+    def update(self, x: np.ndarray) -> None:
+        """
+        Adds a live sample to the window, evicting the oldest one when it is full.
+        """
+        bins = self._get_bins(x)
+        if len(self._window) == self.window_size:
+            self._counts[self._features, self._window.popleft()] -= 1
+        self._window.append(bins)
+        self._counts[self._features, bins] += 1
+
+    def psi(self) -> np.ndarray:
+        """
+        Returns the PSI of every feature over the current window.
+        """
+        actual = np.maximum(self._counts / max(len(self._window), 1), self._EPSILON)
+        return np.sum(
+            (actual - self._expected) * np.log(actual / self._expected), axis=1
+        )
+
+    def drifted_features(self) -> dict[int, float]:
+        """
+        Returns the index and PSI of every feature that drifted, once the window is full.
+        """
+        if len(self._window) < self.window_size:
+            return {}
+
+        psi = self.psi()
+        return {
+            int(feature): float(psi[feature])
+            for feature in np.flatnonzero(psi > self.threshold)
+        }
+
+    def _get_bins(self, X: np.ndarray) -> np.ndarray:
+        # The bin of a value is the number of edges it exceeds.
+        return np.sum(X[..., :, None] > self._edges, axis=-1)
@@ -0,0 +1,352 @@
+from abc import ABC, abstractmethod
+from typing import Hashable, Iterable, Optional
+
+import numpy as np
+from scipy.stats import chi2
+
+
+def grow_rows(array: np.ndarray, capacity: int, fill: float) -> np.ndarray:
+    """
+    Returns the array grown to the capacity along its first axis, keeping its
+    rows and filling the new ones.
+    """
+    grown = np.full((capacity, *array.shape[1:]), fill, dtype=float)
+    grown[: len(array)] = array
+    return grown
+
+
+def _valid_samples(X: np.ndarray) -> np.ndarray:
+    """
+    Returns which samples of a padded (entities, samples, features) array are
+    real, padding samples hold NaN.
+    """
+    return ~np.isnan(X).any(axis=2)
+
+
+class StackedMethod(ABC):
+    """
+    A detection method whose parameters for many entities are stacked along a
+    first slot axis, so every entity is fitted, scored and updated at once.
+
+    Subclasses declare their parameter arrays in _parameters(), which the base
+    class allocates, grows and resets by slot.
+    """
+
+    @abstractmethod
+    def _parameters(self, n_features: int) -> dict[str, tuple[tuple, float]]:
+        """
+        Returns the trailing shape and the initial value of every parameter array.
+        """
+
+    def allocate(self, capacity: int, n_features: int) -> None:
+        """
+        Grows the parameter arrays to the capacity, keeping the existing slots.
+        """
+        for name, (shape, fill) in self._parameters(n_features).items():
+            array = getattr(self, name, None)
+            if array is None:
+                array = np.empty((0, *shape))
+            setattr(self, name, grow_rows(array, capacity, fill))
+
+    def reset(self, slots: np.ndarray) -> None:
+        """
+        Forgets what the slots learned, so they can be given to other entities.
+        """
+        n_features = self._n_features()
+        for name, (_, fill) in self._parameters(n_features).items():
+            getattr(self, name)[slots] = fill
+
+    @abstractmethod
+    def fit(self, slots: np.ndarray, X: np.ndarray) -> None:
+        """
+        Fits the slots on a (slots, samples, features) array, in which entities
+        with fewer samples are padded with NaN samples.
+        """
+
+    @abstractmethod
+    def predict(self, slots: np.ndarray, X: np.ndarray) -> np.ndarray:
+        """
+        Returns the prediction of every slot for its sample in a (slots, features) array.
+        """
+
+    @abstractmethod
+    def _n_features(self) -> int:
+        pass
+
+
+class StackedZScore(StackedMethod):
+    """
+    ZScore for many entities, which also follows new samples with .update().
+    """
+
+    def __init__(self, n: int = 2, threshold: float = 1.5):
+        self.n = n
+        self.threshold = threshold
+        self.counts = None
+        self.means = None
+        self.m2 = None
+
+    def _parameters(self, n_features: int) -> dict[str, tuple[tuple, float]]:
+        return {
+            "counts": ((), 0.0),
+            "means": ((n_features,), 0.0),
+            "m2": ((n_features,), 0.0),
+        }
+
+    def _n_features(self) -> int:
+        return self.means.shape[1]
+
+    def fit(self, slots: np.ndarray, X: np.ndarray) -> None:
+        counts = _valid_samples(X).sum(axis=1)
+        means = np.nanmean(X, axis=1)
+        self.counts[slots] = counts
+        self.means[slots] = means
+        self.m2[slots] = np.nansum((X - means[:, None]) ** 2, axis=1)
+
+    def predict(self, slots: np.ndarray, X: np.ndarray) -> np.ndarray:
+        return (
+            (self.z_scores(slots, X) > self.threshold).sum(axis=1) >= self.n
+        ).astype(float)
+
+    def update(self, slots: np.ndarray, X: np.ndarray) -> None:
+        """
+        Adds a sample to the running mean and variance of every slot (Welford).
+        """
+        self.counts[slots] += 1
+        delta = X - self.means[slots]
+        self.means[slots] += delta / self.counts[slots][:, None]
+        self.m2[slots] += delta * (X - self.means[slots])
+
+    def z_scores(self, slots: np.ndarray, X: np.ndarray) -> np.ndarray:
+        """
+        Returns the absolute z-score of every feature of every slot.
+        """
+        std = np.sqrt(self.m2[slots] / np.maximum(self.counts[slots], 1)[:, None])
+        std[std == 0] = 1
+        return np.abs((X - self.means[slots]) / std)
+
+
+class StackedMaxRule(StackedMethod):
+    """
+    MaxRule for many entities.
+    """
+
+    def __init__(self, n: int = 2, threshold: float = 0.10):
+        self.n = n
+        self.threshold = threshold
+        self.min_values = None
+        self.max_values = None
+
+    def _parameters(self, n_features: int) -> dict[str, tuple[tuple, float]]:
+        return {"min_values": ((n_features,), 0.0), "max_values": ((n_features,), 0.0)}
+
+    def _n_features(self) -> int:
+        return self.min_values.shape[1]
+
+    def fit(self, slots: np.ndarray, X: np.ndarray) -> None:
+        # Like MaxRule, the critical values start at 0.
+        self.min_values[slots] = np.minimum(np.nanmin(X, axis=1), 0)
+        self.max_values[slots] = np.maximum(np.nanmax(X, axis=1), 0)
+
+    def predict(self, slots: np.ndarray, X: np.ndarray) -> np.ndarray:
+        is_outside = (X > self.max_values[slots] * (1 + self.threshold)) | (
+            X < self.min_values[slots] * (1 - self.threshold)
+        )
+        return (is_outside.sum(axis=1) >= self.n).astype(float)
+
+
+class StackedMahalanobis(StackedMethod):
+    """
+    Mahalanobis for many entities, with a (slots, features, features) stack of
+    precision matrices kept up to date by batched Sherman-Morrison updates.
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        confidence: float = 0.999,
+        forgetting_factor: float = 1.0,
+        regularization: float = 1e-6,
+        refresh_interval: int = 1000,
+    ):
+        """
+        :param threshold: The squared distance above which a sample is an anomaly.
+                          If None, the chi-squared quantile at confidence is used.
+        """
+        self.threshold = threshold
+        self.confidence = confidence
+        self.forgetting_factor = forgetting_factor
+        self.regularization = regularization
+        self.refresh_interval = refresh_interval
+        self.weights = None
+        self.updates_since_refresh = None
+        self.means = None
+        self.covariances = None
+        self.precisions = None
+
+    def _parameters(self, n_features: int) -> dict[str, tuple[tuple, float]]:
+        return {
+            "weights": ((), 0.0),
+            "updates_since_refresh": ((), 0.0),
+            "means": ((n_features,), 0.0),
+            "covariances": ((n_features, n_features), 0.0),
+            "precisions": ((n_features, n_features), 0.0),
+        }
+
+    def _n_features(self) -> int:
+        return self.means.shape[1]
+
+    def fit(self, slots: np.ndarray, X: np.ndarray) -> None:
+        is_valid = _valid_samples(X)
+        counts = is_valid.sum(axis=1)
+        means = np.nanmean(X, axis=1)
+        centered = np.where(is_valid[:, :, None], X - means[:, None], 0)
+        self.weights[slots] = counts
+        self.means[slots] = means
+        self.covariances[slots] = (
+            np.einsum("esf,esg->efg", centered, centered) / counts[:, None, None]
+        )
+        self._refresh_precisions(slots)
+
+        if self.threshold is None:
+            self.threshold = chi2.ppf(self.confidence, df=X.shape[2])
+
+    def predict(self, slots: np.ndarray, X: np.ndarray) -> np.ndarray:
+        return (self.anomaly_scores(slots, X) > self.threshold).astype(float)
+
+    def update(self, slots: np.ndarray, X: np.ndarray) -> None:
+        """
+        Incorporates a sample into the mean, covariance and precision of every slot.
+        """
+        self.weights[slots] = self.forgetting_factor * self.weights[slots] + 1
+        alpha = 1 / self.weights[slots]
+        delta = X - self.means[slots]
+
+        self.means[slots] += alpha[:, None] * delta
+        outer = delta[:, :, None] * delta[:, None, :]
+        self.covariances[slots] = (1 - alpha)[:, None, None] * (
+            self.covariances[slots] + alpha[:, None, None] * outer
+        )
+
+        precisions = self.precisions[slots]
+        precision_delta = np.einsum("efg,eg->ef", precisions, delta)
+        denominator = 1 + alpha * np.einsum("ef,ef->e", delta, precision_delta)
+        precisions -= (
+            alpha[:, None, None]
+            * precision_delta[:, :, None]
+            * precision_delta[:, None, :]
+            / denominator[:, None, None]
+        )
+        self.precisions[slots] = precisions / (1 - alpha)[:, None, None]
+
+        self.updates_since_refresh[slots] += 1
+        due = slots[self.updates_since_refresh[slots] >= self.refresh_interval]
+        if len(due) > 0:
+            self._refresh_precisions(due)
+
+    def anomaly_scores(self, slots: np.ndarray, X: np.ndarray) -> np.ndarray:
+        """
+        Returns the squared Mahalanobis distance of the sample of every slot.
+        """
+        delta = X - self.means[slots]
+        return np.einsum("ef,efg,eg->e", delta, self.precisions[slots], delta)
+
+    def _refresh_precisions(self, slots: np.ndarray) -> None:
+        regularized = self.covariances[slots] + self.regularization * np.eye(
+            self._n_features()
+        )
+        self.precisions[slots] = np.linalg.inv(regularized)
+        self.updates_since_refresh[slots] = 0
+
+
+class EntityEngine:
+    """
+    Detects anomalies of many same-shaped entities, such as processes,
+    containers, disks or network interfaces, with one StackedMethod.
+
+    Every entity owns a slot of the stacked parameters. The slots of removed
+    entities are reused and the stack grows by doubling when it is full, so
+    adding or removing an entity never refits or rebuilds the other entities.
+    """
+
+    def __init__(
+        self, method: StackedMethod, n_features: int, initial_capacity: int = 64
+    ) -> None:
+        self.method = method
+        self.n_features = n_features
+        self._slots: dict[Hashable, int] = {}
+        self._free_slots: list[int] = []
+        self._capacity = 0
+        self._allocate(initial_capacity)
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def entities(self) -> list[Hashable]:
+        return list(self._slots)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, entity_id: Hashable) -> bool:
+        return entity_id in self._slots
+
+    def add(self, entity_id: Hashable) -> int:
+        """
+        Returns the slot of the entity, giving it a free slot if it is new.
+        """
+        slot = self._slots.get(entity_id)
+        if slot is not None:
+            return slot
+
+        if not self._free_slots:
+            self._allocate(max(2 * self._capacity, 1))
+        slot = self._free_slots.pop()
+        self._slots[entity_id] = slot
+        return slot
+
+    def remove(self, entity_id: Hashable) -> int:
+        """
+        Frees the slot of the entity and returns it.
+        """
+        slot = self._slots.pop(entity_id)
+        self.method.reset(np.array([slot]))
+        self._free_slots.append(slot)
+        return slot
+
+    def slots(self, entity_ids: Iterable[Hashable]) -> np.ndarray:
+        """
+        Returns the slots of the entities, adding the new ones.
+        """
+        return np.array(
+            [self.add(entity_id) for entity_id in entity_ids], dtype=np.intp
+        )
+
+    def fit(self, slots: np.ndarray, X: np.ndarray) -> None:
+        """
+        Fits the slots on a (slots, samples, features) array, in one batched pass.
+        Entities with fewer samples are padded with NaN samples.
+        """
+        self.method.fit(slots, X)
+
+    def predict(self, slots: np.ndarray, X: np.ndarray) -> np.ndarray:
+        """
+        Returns the prediction of every slot for its row of a (slots, features) array.
+        """
+        return self.method.predict(slots, X)
+
+    def update(self, slots: np.ndarray, X: np.ndarray) -> None:
+        """
+        Feeds a row of a (slots, features) array to every slot, for methods that
+        learn incrementally. Methods without an .update() hook are left untouched.
+        """
+        if hasattr(self.method, "update"):
+            self.method.update(slots, X)
+
+    def _allocate(self, capacity: int) -> None:
+        self.method.allocate(capacity, self.n_features)
+        # Lower slots are handed out first.
+        self._free_slots.extend(range(capacity - 1, self._capacity - 1, -1))
+        self._capacity = capacity
@@ -0,0 +1,228 @@
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+
+class DerivedFeature(ABC):
+    """
+    A feature derived from another feature of the telemetry, computed in O(1)
+    per sample from running state.
+
+    The source feature can be a monitored feature or a derived feature that
+    comes earlier in the list given to the FeatureEngineer.
+    """
+
+    def __init__(self, feature: str, name: str) -> None:
+        self.feature = feature
+        self.name = name
+
+    @abstractmethod
+    def update(
+        self, value: float, timestamp: datetime, age_seconds: float = 0.0
+    ) -> float:
+        """
+        Incorporates the next value of the source feature and returns the derived value.
+
+        :param age_seconds: How long ago the value was collected, above 0 when a
+                            scheduled collection carried a previous value forward.
+        """
+
+    @abstractmethod
+    def reset(self) -> None:
+        pass
+
+
+class Delta(DerivedFeature):
+    """
+    The difference between consecutive values, 0 for the first sample.
+    """
+
+    def __init__(self, feature: str, name: Optional[str] = None) -> None:
+        super().__init__(feature, name or f"{feature}_delta")
+        self.reset()
+
+    def update(
+        self, value: float, timestamp: datetime, age_seconds: float = 0.0
+    ) -> float:
+        delta = 0.0 if self._last_value is None else value - self._last_value
+        self._last_value = value
+        return delta
+
+    def reset(self) -> None:
+        self._last_value = None
+
+
+class Rate(DerivedFeature):
+    """
+    The per-second rate of a cumulative counter, such as the bytes read since boot.
+
+    A counter that goes backwards was reset (e.g. by a reboot), so the sample
+    is treated as the first one instead of reporting a negative rate. A value
+    carried forward by a scheduled collection is not a new sample of the
+    counter, so the last rate is held until the counter is collected again.
+    """
+
+    def __init__(self, feature: str, name: Optional[str] = None) -> None:
+        super().__init__(feature, name or f"{feature}_rate")
+        self.reset()
+
+    def update(
+        self, value: float, timestamp: datetime, age_seconds: float = 0.0
+    ) -> float:
+        if age_seconds > 0 and self._last_value is not None:
+            return self._rate
+
+        last_value, last_timestamp = self._last_value, self._last_timestamp
+        self._last_value, self._last_timestamp = value, timestamp
+        if last_value is None or value < last_value:
+            self._rate = 0.0
+            return self._rate
+
+        elapsed_seconds = (timestamp - last_timestamp).total_seconds()
+        if elapsed_seconds > 0:
+            self._rate = (value - last_value) / elapsed_seconds
+        return self._rate
+
+    def reset(self) -> None:
+        self._last_value = None
+        self._last_timestamp = None
+        self._rate = 0.0
+
+
+class Ewma(DerivedFeature):
+    """
+    An exponentially weighted moving average with a half-life in seconds, so
+    the smoothing does not depend on how often the telemetry is collected.
+    """
+
+    def __init__(
+        self, feature: str, half_life_seconds: float = 60.0, name: Optional[str] = None
+    ) -> None:
+        super().__init__(feature, name or f"{feature}_ewma")
+        self.half_life_seconds = half_life_seconds
+        self.reset()
+
+    def update(
+        self, value: float, timestamp: datetime, age_seconds: float = 0.0
+    ) -> float:
+        if self._average is None:
+            self._average = value
+        else:
+            elapsed_seconds = (timestamp - self._last_timestamp).total_seconds()
+            alpha = 1 - math.exp(
+                -elapsed_seconds * math.log(2) / self.half_life_seconds
+            )
+            self._average += alpha * (value - self._average)
+        self._last_timestamp = timestamp
+        return self._average
+
+    def reset(self) -> None:
+        self._average = None
+        self._last_timestamp = None
+
+
+class _RollingWindow(DerivedFeature):
+    """
+    Keeps the running sum and sum of squares of the last window values.
+
+    The sums are taken relative to the first value ever seen, which avoids the
+    catastrophic cancellation of large values such as byte counters.
+    """
+
+    def __init__(self, feature: str, window: int, name: str) -> None:
+        super().__init__(feature, name)
+        self.window = window
+        self.reset()
+
+    def _push(self, value: float) -> None:
+        if self._shift is None:
+            self._shift = value
+        value -= self._shift
+
+        if len(self._values) == self.window:
+            oldest = self._values.popleft()
+            self._sum -= oldest
+            self._sum_of_squares -= oldest * oldest
+        self._values.append(value)
+        self._sum += value
+        self._sum_of_squares += value * value
+
+    def reset(self) -> None:
+        self._values: deque[float] = deque()
+        self._sum = 0.0
+        self._sum_of_squares = 0.0
+        self._shift = None
+
+
+class RollingMean(_RollingWindow):
+    """
+    The mean of the last window values.
+    """
+
+    def __init__(self, feature: str, window: int = 12, name: Optional[str] = None):
+        super().__init__(feature, window, name or f"{feature}_mean_{window}")
+
+    def update(
+        self, value: float, timestamp: datetime, age_seconds: float = 0.0
+    ) -> float:
+        self._push(value)
+        return self._shift + self._sum / len(self._values)
+
+
+class RollingStd(_RollingWindow):
+    """
+    The population standard deviation of the last window values.
+    """
+
+    def __init__(self, feature: str, window: int = 12, name: Optional[str] = None):
+        super().__init__(feature, window, name or f"{feature}_std_{window}")
+
+    def update(
+        self, value: float, timestamp: datetime, age_seconds: float = 0.0
+    ) -> float:
+        self._push(value)
+        count = len(self._values)
+        mean = self._sum / count
+        return math.sqrt(max(self._sum_of_squares / count - mean * mean, 0.0))
+
+
+class FeatureEngineer:
+    """
+    Adds derived features to every telemetry record, between the collection
+    and the DataPreprocessor.
+    """
+
+    def __init__(self, derived_features: list[DerivedFeature]) -> None:
+        names = [derived_feature.name for derived_feature in derived_features]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Derived feature names must be unique, got {names}.")
+
+        self._derived_features = derived_features
+
+    @property
+    def names(self) -> list[str]:
+        return [derived_feature.name for derived_feature in self._derived_features]
+
+    def transform(self, telemetry: dict) -> dict:
+        """
+        Returns a copy of the telemetry record with the derived features added.
+
+        The record itself is left untouched, since it may also be handed to the
+        database or to other modules.
+        """
+        telemetry = dict(telemetry)
+        timestamp = telemetry["timestamp"]
+        feature_ages = telemetry.get("feature_ages", {})
+        for derived_feature in self._derived_features:
+            telemetry[derived_feature.name] = derived_feature.update(
+                telemetry[derived_feature.feature],
+                timestamp,
+                feature_ages.get(derived_feature.feature, 0.0),
+            )
+        return telemetry
+
+    def reset(self) -> None:
+        for derived_feature in self._derived_features:
+            derived_feature.reset()
@@ -0,0 +1,200 @@
+import heapq
+import sys
+import threading
+import time
+import types
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+import numpy as np
+
+from .module import AnomalyDetectionModule
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Objects of these types are shared by every module and are not counted as
+# part of the memory of a single module.
+_SHARED_TYPES = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    threading.Thread,
+)
+
+
+def estimate_memory_usage(obj, seen: Optional[set[int]] = None) -> int:
+    """
+    Returns an estimate of the bytes held by an object and everything it references.
+
+    NumPy arrays are counted by their buffer size. Pass the same seen set to
+    several calls to count objects shared between them only once.
+    """
+    seen = set() if seen is None else seen
+    stack = [obj]
+    total = 0
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SHARED_TYPES):
+            continue
+        seen.add(id(current))
+
+        if isinstance(current, np.ndarray):
+            total += sys.getsizeof(current)
+            if current.base is None:
+                total += current.nbytes
+            continue
+
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        if hasattr(current, "__dict__"):
+            stack.append(current.__dict__)
+    return total
+
+
+class _HostedModule:
+    def __init__(
+        self,
+        module: AnomalyDetectionModule,
+        telemetry_source: Optional[Callable[[], dict]],
+    ) -> None:
+        self.module = module
+        self.telemetry_source = telemetry_source
+        self.running = False
+        self.ticks = 0
+        self.skipped_ticks = 0
+
+    def tick(self) -> None:
+        if self.telemetry_source is None:
+            self.module.tick()
+        else:
+            self.module.step(self.telemetry_source())
+        self.ticks += 1
+
+
+class ModuleHost:
+    """
+    Runs many AnomalyDetectionModules in a single process.
+
+    One scheduler thread keeps a heap of the next tick of every module and hands
+    due ticks to a shared thread pool. A module never runs two ticks at once: a
+    tick that comes due while the previous one is still running is skipped.
+    """
+
+    def __init__(self, max_workers: int = 4) -> None:
+        self._modules: dict[str, _HostedModule] = {}
+        # Every entry holds the hosted module it was scheduled for, so the entries
+        # of a removed module are skipped even when a module of the same name is added again.
+        self._schedule: list[tuple[float, int, str, _HostedModule]] = []
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._wake_up = threading.Event()
+        self._stopped = threading.Event()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="module-host"
+        )
+
+    def add_module(
+        self,
+        name: str,
+        module: AnomalyDetectionModule,
+        telemetry_source: Optional[Callable[[], dict]] = None,
+    ) -> None:
+        """
+        :param name: A unique name of the monitored stream.
+        :param module: The module of the stream, it is started right away.
+        :param telemetry_source: An optional function returning the next telemetry
+                                 of the stream. If None, the module collects the
+                                 telemetry of this machine.
+        """
+        with self._lock:
+            if name in self._modules:
+                raise ValueError(f"Module {name} is already hosted.")
+
+            module.start()
+            hosted = _HostedModule(module, telemetry_source)
+            self._modules[name] = hosted
+            self._schedule_tick(name, hosted, time.monotonic())
+        self._wake_up.set()
+
+    def remove_module(self, name: str) -> None:
+        with self._lock:
+            del self._modules[name]
+
+    def run(self) -> None:
+        """
+        Runs the scheduler until stop() is called, or returns at once if stop()
+        was called before it started.
+        """
+        while not self._stopped.is_set():
+            with self._lock:
+                now = time.monotonic()
+                # Checked under the lock, so no tick is submitted once stop() shuts the pool down.
+                while (
+                    not self._stopped.is_set()
+                    and self._schedule
+                    and self._schedule[0][0] <= now
+                ):
+                    due_time, _, name, hosted = heapq.heappop(self._schedule)
+                    self._dispatch(name, hosted, due_time)
+                timeout = self._schedule[0][0] - now if self._schedule else None
+
+            self._wake_up.wait(timeout)
+            self._wake_up.clear()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped.set()
+        self._wake_up.set()
+        self._executor.shutdown(wait=True)
+
+    def memory_usage(self) -> dict[str, int]:
+        """
+        Returns the estimated number of bytes held by every hosted module.
+        """
+        with self._lock:
+            modules = dict(self._modules)
+        return {
+            name: estimate_memory_usage(hosted.module)
+            for name, hosted in modules.items()
+        }
+
+    def stats(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                name: {"ticks": hosted.ticks, "skipped_ticks": hosted.skipped_ticks}
+                for name, hosted in self._modules.items()
+            }
+
+    def _dispatch(self, name: str, hosted: _HostedModule, due_time: float) -> None:
+        if self._modules.get(name) is not hosted:
+            return
+
+        if hosted.running:
+            hosted.skipped_ticks += 1
+        else:
+            hosted.running = True
+            future = self._executor.submit(hosted.tick)
+            future.add_done_callback(
+                lambda future: self._on_tick_done(name, hosted, future)
+            )
+        self._schedule_tick(
+            name, hosted, due_time + hosted.module.collection_interval_seconds
+        )
+
+    def _on_tick_done(self, name: str, hosted: _HostedModule, future: Future) -> None:
+        hosted.running = False
+        if future.exception() is not None:
+            logger.exception(
+                f"Tick of module {name} failed.", exc_info=future.exception()
+            )
+
+    def _schedule_tick(self, name: str, hosted: _HostedModule, due_time: float) -> None:
+        self._sequence += 1
+        heapq.heappush(self._schedule, (due_time, self._sequence, name, hosted))
@@ -0,0 +1,386 @@
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Optional, Sequence
+
+from . import database
+from .collection import MonitoredFeature
+from .module import AnomalyDetectionModule
+from .replay import SimulatedClock
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Every frame is a 4 byte payload length followed by the payload:
+# host id length (uint16), host id (utf-8), timestamp (float64, epoch seconds),
+# number of values (uint16) and the values (float64) in monitored features order.
+_LENGTH = struct.Struct("!I")
+_HOST_ID_LENGTH = struct.Struct("!H")
+_SAMPLE_HEADER = struct.Struct("!dH")
+_VALUE = struct.Struct("!d")
+# Timestamps past the last representable datetime cannot be converted.
+_MAX_TIMESTAMP = datetime.max.replace(tzinfo=timezone.utc).timestamp()
+
+Sample = tuple[str, float, tuple[float, ...]]
+ModuleFactory = Callable[[str, Callable[[], datetime]], AnomalyDetectionModule]
+
+
+def encode_sample(host_id: str, timestamp: float, values: Sequence[float]) -> bytes:
+    """
+    Encodes a single telemetry sample into a frame.
+    """
+    host = host_id.encode()
+    payload = (
+        _HOST_ID_LENGTH.pack(len(host))
+        + host
+        + _SAMPLE_HEADER.pack(timestamp, len(values))
+        + struct.pack(f"!{len(values)}d", *values)
+    )
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def decode_samples(buffer: bytes) -> tuple[list[Sample], int]:
+    """
+    Decodes every complete frame in the buffer.
+
+    Returns the samples and the number of bytes consumed, the remaining bytes
+    are the beginning of a frame that has not been fully received yet. Frames
+    whose sizes do not add up to their length, or whose timestamp is not a
+    finite epoch time, are skipped.
+    """
+    samples = []
+    offset = 0
+    while len(buffer) - offset >= _LENGTH.size:
+        (length,) = _LENGTH.unpack_from(buffer, offset)
+        if len(buffer) - offset - _LENGTH.size < length:
+            break
+
+        position = offset + _LENGTH.size
+        offset += _LENGTH.size + length
+        if length < _HOST_ID_LENGTH.size + _SAMPLE_HEADER.size:
+            logger.warning(
+                f"Skipping a frame of {length} bytes, too short for a sample."
+            )
+            continue
+
+        (host_length,) = _HOST_ID_LENGTH.unpack_from(buffer, position)
+        header_position = position + _HOST_ID_LENGTH.size + host_length
+        if header_position + _SAMPLE_HEADER.size > offset:
+            logger.warning(
+                f"Skipping a frame of {length} bytes with a {host_length} byte host id."
+            )
+            continue
+
+        timestamp, n_values = _SAMPLE_HEADER.unpack_from(buffer, header_position)
+        values_size = offset - header_position - _SAMPLE_HEADER.size
+        if values_size != n_values * _VALUE.size:
+            logger.warning(
+                f"Skipping a frame declaring {n_values} values in {values_size} bytes."
+            )
+            continue
+
+        if not (math.isfinite(timestamp) and 0 <= timestamp < _MAX_TIMESTAMP):
+            logger.warning(f"Skipping a frame with the timestamp {timestamp}.")
+            continue
+
+        host_id = bytes(
+            buffer[position + _HOST_ID_LENGTH.size : header_position]
+        ).decode()
+        values = struct.unpack_from(
+            f"!{n_values}d", buffer, header_position + _SAMPLE_HEADER.size
+        )
+        samples.append((host_id, timestamp, values))
+    return samples, offset
+
+
+def get_shard(host_id: str, n_shards: int) -> int:
+    """
+    Returns the worker that owns the host, stable across processes and restarts.
+    """
+    return zlib.crc32(host_id.encode()) % n_shards
+
+
+def _run_worker(
+    queue: multiprocessing.Queue,
+    processed: multiprocessing.Value,
+    module_factory: ModuleFactory,
+    monitored_features: list[MonitoredFeature],
+    db_url: Optional[str],
+    log_level: int,
+) -> None:
+    """
+    Runs the modules of the hosts in one shard, one batch of samples at a time.
+    """
+    logging.getLogger(AnomalyDetectionModule.__module__).setLevel(log_level)
+    session_factory = database.init_db(db_url) if db_url else None
+    modules: dict[str, AnomalyDetectionModule] = {}
+    clocks: dict[str, SimulatedClock] = {}
+    failed_hosts: set[str] = set()
+
+    while True:
+        batch = queue.get()
+        if batch is None:
+            break
+
+        records = []
+        for host_id, timestamp, values in batch:
+            if len(values) != len(monitored_features):
+                logger.warning(
+                    f"Dropping a sample of host {host_id} with {len(values)} values "
+                    f"instead of {len(monitored_features)}."
+                )
+                continue
+            if host_id in failed_hosts:
+                continue
+
+            try:
+                telemetry = {
+                    "timestamp": datetime.fromtimestamp(timestamp, timezone.utc)
+                }
+            except (ValueError, OverflowError, OSError) as e:
+                logger.warning(
+                    f"Dropping a sample of host {host_id} with the timestamp "
+                    f"{timestamp}: {e}"
+                )
+                continue
+            telemetry.update(zip(monitored_features, values))
+
+            module = modules.get(host_id)
+            if module is None:
+                try:
+                    # Every host runs on its own clock, driven by its sample timestamps.
+                    clock = SimulatedClock(telemetry["timestamp"])
+                    module = module_factory(host_id, clock)
+                    module.start()
+                except Exception:
+                    # One host that cannot be monitored must not stop the other hosts.
+                    logger.exception(
+                        f"Error starting the module of host {host_id}, "
+                        "dropping its samples."
+                    )
+                    failed_hosts.add(host_id)
+                    continue
+                clocks[host_id] = clock
+                modules[host_id] = module
+                logger.info(f"Started monitoring host {host_id}.")
+
+            clocks[host_id].set(telemetry["timestamp"])
+            try:
+                module.step(telemetry)
+            except Exception:
+                # One failing host must not stop the other hosts of the shard.
+                logger.exception(f"Error processing a sample of host {host_id}.")
+            if session_factory:
+                records.append({**telemetry, "host_id": host_id})
+
+        if records:
+            try:
+                database.write_telemetry_batch(session_factory, records)
+            except Exception as e:
+                logger.warning(f"Error writing telemetry batch to database: {e}")
+
+        with processed.get_lock():
+            processed.value += len(batch)
+
+
+class IngestServer:
+    """
+    Receives telemetry samples of many hosts over TCP and runs a module per host.
+
+    Hosts are sharded across worker processes by their id. Samples are batched
+    per shard before they are handed to the workers, and a connection stops
+    being read while its shard's queue is full, so slow workers push back on
+    the agents through TCP flow control instead of growing memory.
+
+    The hosts are monitored from the samples they send, so on a machine
+    without the hardware providers, anomaly.synthetic.install_stub_providers()
+    must be called before the package is imported.
+    """
+
+    def __init__(
+        self,
+        module_factory: ModuleFactory,
+        monitored_features: list[MonitoredFeature],
+        host: str = "127.0.0.1",
+        port: int = 9500,
+        n_workers: Optional[int] = None,
+        batch_size: int = 256,
+        flush_interval_seconds: float = 0.5,
+        max_pending_batches: int = 64,
+        db_url: Optional[str] = None,
+        worker_log_level: int = logging.WARNING,
+    ) -> None:
+        """
+        :param module_factory: A picklable function that returns the module of a host,
+                               given the host id and the clock the module must use.
+        :param monitored_features: The features of every sample, in the order of their values.
+        :param n_workers: The number of worker processes, the CPU count by default.
+        :param batch_size: The number of samples handed to a worker at once.
+        :param flush_interval_seconds: The longest time a partial batch waits.
+        :param max_pending_batches: The capacity of every worker queue.
+        :param db_url: If set, the workers write every sample to this database.
+        :param worker_log_level: The log level of the per-host modules.
+        """
+        self._module_factory = module_factory
+        self._monitored_features = monitored_features
+        self._host = host
+        self._port = port
+        self._n_workers = n_workers or os.cpu_count() or 1
+        self._batch_size = batch_size
+        self._flush_interval_seconds = flush_interval_seconds
+        self._max_pending_batches = max_pending_batches
+        self._db_url = db_url
+        self._worker_log_level = worker_log_level
+
+        self._queues: list[multiprocessing.Queue] = []
+        self._workers: list[multiprocessing.Process] = []
+        self._processed: list[multiprocessing.Value] = []
+        self._pending: list[list[Sample]] = [[] for _ in range(self._n_workers)]
+        self._flush_locks: list[asyncio.Lock] = []
+        self._executor = ThreadPoolExecutor(max_workers=self._n_workers)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._connections: set[asyncio.Task] = set()
+        self._writers: dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self.received = 0
+
+    @property
+    def processed(self) -> int:
+        """
+        Returns the number of samples processed by the workers.
+        """
+        return sum(counter.value for counter in self._processed)
+
+    @property
+    def port(self) -> int:
+        """
+        Returns the port the server listens on, useful when it was started on port 0.
+        """
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self) -> None:
+        if self._db_url:
+            # Create the schema once, before the workers connect concurrently.
+            database.init_db(self._db_url)
+
+        for _ in range(self._n_workers):
+            queue = multiprocessing.Queue(maxsize=self._max_pending_batches)
+            processed = multiprocessing.Value("q", 0)
+            worker = multiprocessing.Process(
+                target=_run_worker,
+                args=(
+                    queue,
+                    processed,
+                    self._module_factory,
+                    self._monitored_features,
+                    self._db_url,
+                    self._worker_log_level,
+                ),
+                daemon=True,
+            )
+            worker.start()
+            self._queues.append(queue)
+            self._processed.append(processed)
+            self._workers.append(worker)
+
+        self._flush_locks = [asyncio.Lock() for _ in range(self._n_workers)]
+        self._server = await asyncio.start_server(
+            self._handle_connection, self._host, self._port
+        )
+        self._flush_task = asyncio.create_task(self._flush_periodically())
+        logger.info(
+            f"Ingest server listening on {self._host}:{self.port} "
+            f"with {self._n_workers} workers."
+        )
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self, timeout_seconds: float = 5.0) -> None:
+        """
+        Stops accepting connections, gives the open ones up to timeout_seconds to
+        finish sending, hands the pending batches to the workers and waits for
+        them to process everything.
+        """
+        if self._server is None:
+            return
+
+        self._server.close()
+        if self._connections:
+            _, still_open = await asyncio.wait(
+                list(self._connections), timeout=timeout_seconds
+            )
+            for task in still_open:
+                self._writers[task].close()
+            # A connection blocked on a full queue only exits once its batch is queued,
+            # so no batch can reach a worker after its stop sentinel.
+            await asyncio.gather(*still_open, return_exceptions=True)
+
+        self._flush_task.cancel()
+        for shard in range(self._n_workers):
+            await self._flush(shard)
+
+        loop = asyncio.get_running_loop()
+        for queue, worker in zip(self._queues, self._workers):
+            await loop.run_in_executor(self._executor, queue.put, None)
+            await loop.run_in_executor(self._executor, worker.join)
+        self._executor.shutdown()
+        self._server = None
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        self._writers[task] = writer
+        buffer = bytearray()
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+
+                buffer += data
+                samples, consumed = decode_samples(buffer)
+                del buffer[:consumed]
+                self.received += len(samples)
+
+                for sample in samples:
+                    shard = get_shard(sample[0], self._n_workers)
+                    self._pending[shard].append(sample)
+                    if len(self._pending[shard]) >= self._batch_size:
+                        # Not reading until the batch is queued applies the backpressure.
+                        await self._flush(shard)
+        except (ConnectionError, struct.error, UnicodeDecodeError) as e:
+            logger.warning(f"Dropping ingest connection: {e}")
+        finally:
+            writer.close()
+            self._connections.discard(task)
+            del self._writers[task]
+
+    async def _flush(self, shard: int) -> None:
+        # Batches of a shard are queued one at a time, so they reach the worker in order.
+        async with self._flush_locks[shard]:
+            batch = self._pending[shard]
+            if not batch:
+                return
+
+            self._pending[shard] = []
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._queues[shard].put, batch)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval_seconds)
+            for shard in range(self._n_workers):
+                await self._flush(shard)
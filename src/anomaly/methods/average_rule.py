@@ -1,9 +1,13 @@
+import numpy as np
+
+
 class AverageRule:
-    average_values = {}
+    decision_parameters = ("n", "threshold")
 
     def __init__(self, n: int = 2, threshold: float = 0.10):
         self.n = n
         self.threshold = threshold
+        self.average_values = {}
 
     def fit(self, X):
         for i in range(len(X)):
@@ -28,3 +32,13 @@ class AverageRule:
             return 1.0
 
         return 0.0
+
+    def predict_batch(self, X) -> np.ndarray:
+        """
+        Returns the prediction of every sample, like .predict() does for one.
+        """
+        average_values = np.array([self.average_values[j] for j in range(X.shape[1])])
+        is_outside = (X > average_values * (1 + self.threshold)) | (
+            X < average_values * (1 - self.threshold)
+        )
+        return (is_outside.sum(axis=1) >= self.n).astype(float)
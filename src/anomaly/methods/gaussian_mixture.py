@@ -2,6 +2,8 @@ from sklearn.mixture import GaussianMixture
 
 
 class GaussianMixtureWithThreshold:
+    decision_parameters = ("threshold",)
+
     def __init__(
         self,
         n_components: int = 1,
@@ -13,13 +15,11 @@ class GaussianMixtureWithThreshold:
         self.model = GaussianMixture(
             n_components=n_components, covariance_type=covariance_type
         )
-        self.fitted_scores = None
 
     def fit(self, X):
         self.model.fit(X)
-        scores = self.model.score_samples(X)
-        self.fitted_scores = scores
         if self.threshold is None:
+            scores = self.model.score_samples(X)
             self.threshold = scores.mean() - 2 * scores.std()
 
     def predict(self, X) -> float:
@@ -29,3 +29,22 @@ class GaussianMixtureWithThreshold:
         if is_anomaly:
             return 1.0
         return 0.0
+
+    def predict_batch(self, X):
+        """
+        Returns the prediction of every sample, like .predict() does for one.
+        """
+        return (self.model.score_samples(X) < self.threshold).astype(float)
+
+    @property
+    def score_threshold(self) -> float:
+        """
+        Returns the anomaly score above which a sample is an anomaly.
+        """
+        return -self.threshold
+
+    def anomaly_scores(self, X):
+        """
+        Returns the negative log-likelihood of every sample.
+        """
+        return -self.model.score_samples(X)
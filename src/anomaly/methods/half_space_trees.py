@@ -0,0 +1,175 @@
+from typing import Optional
+
+import numpy as np
+
+
+class HalfSpaceTrees:
+    """
+    Streaming Half-Space Trees (Tan, Ting & Liu, 2011).
+
+    Every tree recursively halves a randomly perturbed copy of the feature space
+    and counts how many samples fall into each node. A sample lying in sparsely
+    populated regions gets a low mass score and is reported as an anomaly.
+    Scoring and updating walk one root-to-leaf path per tree, so both cost
+    O(n_trees * depth) per sample and the memory is fixed by the tree shape.
+    """
+
+    decision_parameters = ("threshold",)
+
+    def __init__(
+        self,
+        n_trees: int = 25,
+        depth: int = 10,
+        window_size: int = 250,
+        contamination: float = 0.01,
+        max_samples: int = 2000,
+        random_state: Optional[int] = None,
+    ):
+        """
+        :param n_trees: The number of trees in the ensemble.
+        :param depth: The depth of every tree.
+        :param window_size: The number of updates after which the latest window
+                            becomes the reference window used for scoring.
+        :param contamination: The fraction of training samples expected to be
+                              anomalous, used to derive the score threshold.
+        :param max_samples: The maximum number of evenly spaced training samples used
+                            to estimate the reference mass and the threshold, which
+                            bounds the fit cost regardless of the window size.
+        :param random_state: Seed for the tree structure.
+        """
+        self.n_trees = n_trees
+        self.depth = depth
+        self.window_size = window_size
+        self.contamination = contamination
+        self.max_samples = max_samples
+        self.random_state = random_state
+        self.size_limit = 0.1 * window_size
+        self.threshold = None
+
+    def fit(self, X):
+        self._build_trees(X)
+
+        X_sample = X[:: max(1, int(np.ceil(len(X) / self.max_samples)))]
+        self.reference_mass = np.zeros_like(self.latest_mass)
+        self._add_mass(self.reference_mass, X_sample)
+        # Scale the training counts to a single window, so streamed windows are comparable.
+        self.reference_mass *= self.window_size / max(len(X_sample), 1)
+
+        self.threshold = np.quantile(self.score_samples(X_sample), self.contamination)
+
+    def predict(self, X) -> float:
+        score = self.score_samples(X.reshape(1, -1))[0]
+        if score < self.threshold:
+            return 1.0
+        return 0.0
+
+    def predict_batch(self, X) -> np.ndarray:
+        """
+        Returns the prediction of every sample, like .predict() does for one.
+        """
+        return (self.score_samples(X) < self.threshold).astype(float)
+
+    def update(self, X) -> None:
+        """
+        Count a single sample into the latest window, rotating the windows when it is full.
+        """
+        paths = self._get_paths(X.reshape(1, -1))[0]
+        self.latest_mass[np.arange(self.n_trees)[:, None], paths] += 1
+        self._window_count += 1
+        if self._window_count >= self.window_size:
+            self.reference_mass = self.latest_mass
+            self.latest_mass = np.zeros_like(self.reference_mass)
+            self._window_count = 0
+
+    @property
+    def score_threshold(self) -> float:
+        """
+        Returns the anomaly score above which a sample is an anomaly.
+        """
+        return -self.threshold
+
+    def anomaly_scores(self, X) -> np.ndarray:
+        """
+        Returns the negative mass score of every sample.
+        """
+        return -self.score_samples(X)
+
+    def score_samples(self, X) -> np.ndarray:
+        """
+        Returns the mass score of every sample, lower scores are more anomalous.
+        """
+        scores = np.empty(len(X))
+        levels = np.arange(self.depth + 1)
+        tree_indices = np.arange(self.n_trees)[None, :, None]
+        for start in range(0, len(X), 10000):
+            paths = self._get_paths(X[start : start + 10000])
+            masses = self.reference_mass[tree_indices, paths]
+            # Scoring stops at the first node that holds fewer than size_limit samples.
+            is_sparse = masses < self.size_limit
+            is_sparse[:, :, -1] = True
+            stop_levels = is_sparse.argmax(axis=2)
+            stop_masses = np.take_along_axis(masses, stop_levels[..., None], axis=2)
+            scores[start : start + 10000] = (
+                stop_masses[..., 0] * np.exp2(levels[stop_levels])
+            ).sum(axis=1)
+        return scores
+
+    def _build_trees(self, X) -> None:
+        rng = np.random.default_rng(self.random_state)
+        n_features = X.shape[1]
+        n_internal_nodes = 2**self.depth - 1
+
+        # Every tree works in a workspace randomly shifted around the data range.
+        min_values = X.min(axis=0)
+        spans = np.maximum(X.max(axis=0) - min_values, 1e-9)
+        centers = min_values + rng.uniform(0, 1, (self.n_trees, n_features)) * spans
+        radii = 2 * np.maximum(centers - min_values, min_values + spans - centers)
+        lower = (centers - radii)[:, None, :]
+        upper = (centers + radii)[:, None, :]
+
+        self.split_features = rng.integers(
+            0, n_features, (self.n_trees, n_internal_nodes)
+        )
+        self.split_values = np.empty((self.n_trees, n_internal_nodes))
+        trees = np.arange(self.n_trees)[:, None]
+        for level in range(self.depth):
+            first_node = 2**level - 1
+            nodes = slice(first_node, 2 * first_node + 1)
+            features = self.split_features[:, nodes]
+            level_nodes = np.arange(features.shape[1])[None, :]
+            middles = (
+                lower[trees, level_nodes, features]
+                + upper[trees, level_nodes, features]
+            ) / 2
+            self.split_values[:, nodes] = middles
+
+            # The children of a level are stored consecutively, left child first.
+            lower = np.repeat(lower, 2, axis=1)
+            upper = np.repeat(upper, 2, axis=1)
+            upper[trees, 2 * level_nodes, features] = middles
+            lower[trees, 2 * level_nodes + 1, features] = middles
+
+        self.latest_mass = np.zeros((self.n_trees, 2 ** (self.depth + 1) - 1))
+        self._window_count = 0
+
+    def _get_paths(self, X) -> np.ndarray:
+        """
+        Returns the node index at every level of every tree, shaped (samples, trees, depth + 1).
+        """
+        paths = np.zeros((len(X), self.n_trees, self.depth + 1), dtype=np.intp)
+        tree_offsets = np.arange(self.n_trees) * self.split_features.shape[1]
+        split_features = self.split_features.ravel()
+        split_values = self.split_values.ravel()
+        nodes = paths[:, :, 0]
+        for level in range(self.depth):
+            split_nodes = nodes + tree_offsets
+            values = np.take_along_axis(X, split_features.take(split_nodes), axis=1)
+            nodes = 2 * nodes + 1 + (values >= split_values.take(split_nodes))
+            paths[:, :, level + 1] = nodes
+        return paths
+
+    def _add_mass(self, mass: np.ndarray, X) -> None:
+        n_nodes = mass.shape[1]
+        paths = self._get_paths(X) + np.arange(self.n_trees)[None, :, None] * n_nodes
+        counts = np.bincount(paths.ravel(), minlength=mass.size)
+        mass += counts.reshape(mass.shape)
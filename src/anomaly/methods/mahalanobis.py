@@ -0,0 +1,122 @@
+from typing import Optional
+
+import numpy as np
+from scipy.stats import chi2
+
+
+class Mahalanobis:
+    """
+    Multivariate Gaussian baseline scored by the squared Mahalanobis distance.
+
+    The mean, covariance and precision (inverse covariance) matrix are kept up
+    to date by .update() with rank-one Sherman-Morrison updates, so each sample
+    costs O(d^2) instead of a full refit.
+    """
+
+    decision_parameters = ("threshold",)
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        confidence: float = 0.999,
+        forgetting_factor: float = 1.0,
+        regularization: float = 1e-6,
+        refresh_interval: int = 1000,
+        warm_start: bool = False,
+    ):
+        """
+        :param threshold: The squared distance above which a sample is an anomaly.
+                          If None, the chi-squared quantile at confidence is used.
+        :param confidence: The chi-squared confidence used when threshold is None.
+        :param forgetting_factor: The weight kept by past samples on every update,
+                                  1.0 keeps all history, lower values forget exponentially.
+        :param regularization: The ridge added to the covariance diagonal, which keeps
+                               the near-singular covariances of idle hosts invertible.
+        :param refresh_interval: The number of updates after which the precision is
+                                 recomputed exactly, restoring the ridge and clearing
+                                 accumulated floating point error.
+        :param warm_start: If True, .fit() is a no-op once the model is fitted and the
+                           model is only maintained by .update(). Only use it when the
+                           inputs keep the same scale across retrains.
+        """
+        self.threshold = threshold
+        self.confidence = confidence
+        self.forgetting_factor = forgetting_factor
+        self.regularization = regularization
+        self.refresh_interval = refresh_interval
+        self.warm_start = warm_start
+        self.mean = None
+        self.covariance = None
+        self.precision = None
+
+    def fit(self, X):
+        if self.warm_start and self.mean is not None:
+            return
+
+        self.mean = X.mean(axis=0)
+        centered = X - self.mean
+        self.covariance = centered.T @ centered / len(X)
+        self._weight = float(len(X))
+        self._refresh_precision()
+
+        if self.threshold is None:
+            self.threshold = chi2.ppf(self.confidence, df=X.shape[1])
+
+    def predict(self, X) -> float:
+        delta = X - self.mean
+        distance = delta @ self.precision @ delta
+        if distance > self.threshold:
+            return 1.0
+        return 0.0
+
+    def predict_batch(self, X) -> np.ndarray:
+        """
+        Returns the prediction of every sample, like .predict() does for one.
+        """
+        return (self.anomaly_scores(X) > self.threshold).astype(float)
+
+    def update(self, X) -> None:
+        """
+        Incorporate a single sample into the mean, covariance and precision in O(d^2).
+        """
+        self._weight = self.forgetting_factor * self._weight + 1
+        alpha = 1 / self._weight
+        delta = X - self.mean
+
+        self.mean += alpha * delta
+        # C' = (1 - alpha) * (C + alpha * delta delta^T)
+        self.covariance = (1 - alpha) * (
+            self.covariance + alpha * np.outer(delta, delta)
+        )
+
+        # Sherman-Morrison: (C + u v^T)^-1 = P - P u v^T P / (1 + v^T P u)
+        precision_delta = self.precision @ delta
+        self.precision -= (alpha * np.outer(precision_delta, precision_delta)) / (
+            1 + alpha * delta @ precision_delta
+        )
+        self.precision /= 1 - alpha
+
+        self._updates_since_refresh += 1
+        if self._updates_since_refresh >= self.refresh_interval:
+            self._refresh_precision()
+
+    @property
+    def score_threshold(self) -> float:
+        """
+        Returns the anomaly score above which a sample is an anomaly.
+        """
+        return self.threshold
+
+    def anomaly_scores(self, X) -> np.ndarray:
+        """
+        Returns the squared Mahalanobis distance of every sample.
+        """
+        delta = X - self.mean
+        return np.einsum("ij,jk,ik->i", delta, self.precision, delta)
+
+    def _refresh_precision(self) -> None:
+        regularized = self.covariance + self.regularization * np.eye(
+            len(self.covariance)
+        )
+        self.precision = np.linalg.inv(regularized)
+        self._updates_since_refresh = 0
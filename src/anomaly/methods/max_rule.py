@@ -1,9 +1,13 @@
+import numpy as np
+
+
 class MaxRule:
-    critical_values = {}
+    decision_parameters = ("n", "threshold")
 
     def __init__(self, n: int = 2, threshold: float = 0.10):
         self.n = n
         self.threshold = threshold
+        self.critical_values = {}
 
     def fit(self, X):
         for i in range(len(X)):
@@ -30,3 +34,15 @@ class MaxRule:
             return 1.0
 
         return 0.0
+
+    def predict_batch(self, X) -> np.ndarray:
+        """
+        Returns the prediction of every sample, like .predict() does for one.
+        """
+        min_values, max_values = np.array(
+            [self.critical_values[j] for j in range(X.shape[1])]
+        ).T
+        is_outside = (X > max_values * (1 + self.threshold)) | (
+            X < min_values * (1 - self.threshold)
+        )
+        return (is_outside.sum(axis=1) >= self.n).astype(float)
@@ -0,0 +1,118 @@
+from typing import Optional, Union
+
+import numpy as np
+from sklearn.kernel_approximation import Nystroem
+from sklearn.linear_model import SGDOneClassSVM
+
+
+class NystroemOneClassSVM:
+    """
+    One-class SVM on a Nystroem approximation of the RBF kernel.
+
+    The kernel is approximated by n_components landmarks and the one-class
+    problem is solved by a linear SGD model in that feature space, so fitting
+    scales linearly with the window size and predicting costs the same for
+    every sample, regardless of how many samples were used for training.
+    """
+
+    def __init__(
+        self,
+        nu: float = 0.1,
+        gamma: Union[str, float] = "scale",
+        n_components: int = 100,
+        max_samples: Optional[int] = None,
+        n_strata: int = 10,
+        random_state: Optional[int] = None,
+    ):
+        """
+        :param nu: An upper bound on the fraction of training errors, as in OneClassSVM.
+        :param gamma: The RBF kernel coefficient, or "scale" to use 1 / (n_features * X.var()).
+        :param n_components: The number of landmarks used to approximate the kernel.
+        :param max_samples: If set, fit on at most this many samples drawn evenly
+                            from n_strata consecutive time strata of the window.
+        :param n_strata: The number of time strata used for subsampling.
+        :param random_state: Seed for the landmarks, the subsampling and SGD.
+        """
+        self.nu = nu
+        self.gamma = gamma
+        self.n_components = n_components
+        self.max_samples = max_samples
+        self.n_strata = n_strata
+        self.random_state = random_state
+        self.feature_map = None
+        self.model = SGDOneClassSVM(nu=nu, random_state=random_state)
+
+    def fit(self, X):
+        X_train = self._subsample(X)
+        self.feature_map = Nystroem(
+            kernel="rbf",
+            gamma=self._get_gamma(X_train),
+            n_components=min(self.n_components, len(X_train)),
+            random_state=self.random_state,
+        )
+        features = self.feature_map.fit_transform(X_train)
+        self.model.fit(features)
+
+        # Fold the landmark normalization into the linear model so that a single
+        # sample is scored with plain NumPy, without sklearn's per-call overhead.
+        self._landmarks = self.feature_map.components_
+        self._weights = self.feature_map.normalization_.T @ self.model.coef_
+        self._offset = self.model.offset_[0]
+        self._gamma = self.feature_map.gamma
+
+    def predict(self, X) -> float:
+        squared_distances = ((self._landmarks - X) ** 2).sum(axis=1)
+        decision = np.exp(-self._gamma * squared_distances) @ self._weights
+        return 1.0 if decision - self._offset < 0 else 0.0
+
+    def predict_batch(self, X) -> np.ndarray:
+        """
+        Returns the prediction of every sample, like .predict() does for one.
+        """
+        squared_distances = (
+            (X**2).sum(axis=1)[:, None]
+            - 2 * X @ self._landmarks.T
+            + (self._landmarks**2).sum(axis=1)[None, :]
+        )
+        decisions = (
+            np.exp(-self._gamma * np.maximum(squared_distances, 0)) @ self._weights
+        )
+        return (decisions - self._offset < 0).astype(float)
+
+    @property
+    def score_threshold(self) -> float:
+        """
+        Returns the anomaly score above which a sample is an anomaly, the hyperplane.
+        """
+        return 0.0
+
+    def anomaly_scores(self, X) -> np.ndarray:
+        """
+        Returns the negative signed distance of every sample to the separating hyperplane.
+        """
+        return -self.model.decision_function(self.feature_map.transform(X))
+
+    def _get_gamma(self, X) -> float:
+        if self.gamma != "scale":
+            return self.gamma
+        variance = X.var()
+        return 1.0 / (X.shape[1] * variance) if variance > 0 else 1.0
+
+    def _subsample(self, X):
+        """
+        Draw max_samples rows evenly from consecutive time strata of X, so the
+        whole window stays represented instead of only its densest part.
+        """
+        if self.max_samples is None or len(X) <= self.max_samples:
+            return X
+
+        rng = np.random.default_rng(self.random_state)
+        # At most one stratum per sample, so that every stratum gives at least one.
+        n_strata = max(min(self.n_strata, self.max_samples), 1)
+        strata = np.array_split(np.arange(len(X)), n_strata)
+        samples_per_stratum = self.max_samples // len(strata)
+        indices = [
+            rng.choice(stratum, min(samples_per_stratum, len(stratum)), replace=False)
+            for stratum in strata
+        ]
+        return X[np.sort(np.concatenate(indices))]
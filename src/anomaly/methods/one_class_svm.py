@@ -12,3 +12,22 @@ class OneClassSVMWrapper:
         X_2d = X.reshape(1, -1)
         preds = self.model.predict(X_2d)
         return 1.0 if preds[0] == -1 else 0.0
+
+    def predict_batch(self, X):
+        """
+        Returns the prediction of every sample, like .predict() does for one.
+        """
+        return (self.model.predict(X) == -1).astype(float)
+
+    @property
+    def score_threshold(self) -> float:
+        """
+        Returns the anomaly score above which a sample is an anomaly, the hyperplane.
+        """
+        return 0.0
+
+    def anomaly_scores(self, X):
+        """
+        Returns the negative signed distance of every sample to the separating hyperplane.
+        """
+        return -self.model.decision_function(X)
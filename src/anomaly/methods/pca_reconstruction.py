@@ -0,0 +1,86 @@
+from typing import Optional
+
+import numpy as np
+
+from ..projection import PCAProjection
+
+
+class PCAReconstructionError:
+    """
+    Scores a sample by its squared distance to its reconstruction from the
+    principal components of the training data. Samples that break the usual
+    correlations between the features, such as a high CPU usage without the
+    matching temperature, reconstruct badly.
+
+    Scoring costs two small matrix products, which makes it a cheap first
+    detector. .update() collects the normal samples and refines the components
+    with every batch of update_batch_size of them.
+    """
+
+    decision_parameters = ("error_threshold",)
+
+    def __init__(
+        self,
+        n_components: Optional[int] = None,
+        explained_variance: float = 0.95,
+        threshold: Optional[float] = None,
+        quantile: float = 0.999,
+        batch_size: int = 1000,
+        update_batch_size: int = 500,
+    ):
+        """
+        :param n_components: The number of components to keep. If None, it is
+                             chosen from explained_variance.
+        :param threshold: The reconstruction error above which a sample is an anomaly.
+                          If None, the quantile of the training errors is used.
+        :param quantile: The quantile of the training errors used when threshold is None.
+        :param batch_size: The number of samples of every incremental PCA batch.
+        :param update_batch_size: The number of updates collected before the components
+                                  are refined with them.
+        """
+        self.threshold = threshold
+        self.quantile = quantile
+        self.update_batch_size = update_batch_size
+        self.projection = PCAProjection(n_components, explained_variance, batch_size)
+        self.error_threshold = threshold
+        self._pending: list[np.ndarray] = []
+
+    def fit(self, X):
+        self.projection.fit(X)
+        self._pending = []
+        if self.threshold is None:
+            self.error_threshold = float(
+                np.quantile(self.projection.reconstruction_errors(X), self.quantile)
+            )
+        else:
+            self.error_threshold = self.threshold
+
+    def predict(self, X) -> float:
+        if self.projection.reconstruction_errors(X) > self.error_threshold:
+            return 1.0
+        return 0.0
+
+    def predict_batch(self, X) -> np.ndarray:
+        """
+        Returns the prediction of every sample, like .predict() does for one.
+        """
+        return (self.anomaly_scores(X) > self.error_threshold).astype(float)
+
+    def update(self, X) -> None:
+        self._pending.append(X)
+        if len(self._pending) >= self.update_batch_size:
+            self.projection.partial_fit(np.array(self._pending))
+            self._pending = []
+
+    @property
+    def score_threshold(self) -> float:
+        """
+        Returns the anomaly score above which a sample is an anomaly.
+        """
+        return self.error_threshold
+
+    def anomaly_scores(self, X) -> np.ndarray:
+        """
+        Returns the reconstruction error of every sample.
+        """
+        return self.projection.reconstruction_errors(X)
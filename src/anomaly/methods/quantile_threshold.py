@@ -0,0 +1,63 @@
+from ..thresholds import P2Quantile
+
+
+class QuantileThreshold:
+    """
+    Flags the top (1 - quantile) fraction of the anomaly scores of a wrapped method.
+
+    The threshold is a streaming quantile estimate, seeded with the scores of the
+    training data at every fit and updated with every score seen by .predict(),
+    so it keeps tracking the live score distribution between refits in constant memory.
+    """
+
+    def __init__(self, method, quantile: float = 0.999):
+        """
+        :param method: A method that supports .fit() and .anomaly_scores(),
+                       where higher scores are more anomalous. The timestamps are
+                       passed through to methods with uses_timestamps set.
+        :param quantile: The score quantile above which a sample is an anomaly,
+                         e.g. 0.999 flags the top 0.1% of scores.
+        """
+        self.method = method
+        self.quantile = quantile
+        self.sketch = P2Quantile(quantile)
+
+    @property
+    def uses_timestamps(self) -> bool:
+        return getattr(self.method, "uses_timestamps", False)
+
+    @property
+    def threshold(self) -> float:
+        return self.sketch.value
+
+    @property
+    def score_threshold(self) -> float:
+        """
+        Returns the anomaly score above which a sample is an anomaly.
+        """
+        return self.sketch.value
+
+    def fit(self, X, *timestamps):
+        self.method.fit(X, *timestamps)
+        # The score scale changes with every fit, so the sketch starts over.
+        self.sketch = P2Quantile(self.quantile)
+        for score in self.method.anomaly_scores(X, *timestamps):
+            self.sketch.update(score)
+
+    def predict(self, X, *timestamp) -> float:
+        # The method scores batches, so a timestamp is passed as a batch of one.
+        score = self.method.anomaly_scores(X.reshape(1, -1), *[[t] for t in timestamp])[
+            0
+        ]
+        is_anomaly = score > self.sketch.value
+        self.sketch.update(score)
+        if is_anomaly:
+            return 1.0
+        return 0.0
+
+    def update(self, X, *timestamp) -> None:
+        if hasattr(self.method, "update"):
+            self.method.update(X, *timestamp)
+
+    def anomaly_scores(self, X, *timestamps):
+        return self.method.anomaly_scores(X, *timestamps)
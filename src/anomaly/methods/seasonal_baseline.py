@@ -0,0 +1,124 @@
+from datetime import datetime
+from typing import Sequence
+
+import numpy as np
+
+_HOURS_PER_WEEK = 168
+_HOURS_PER_DAY = 24
+# The rows of the index: the hours of the week, then the hours of the day, then all samples.
+_DAILY_OFFSET = _HOURS_PER_WEEK
+_GLOBAL_ROW = _HOURS_PER_WEEK + _HOURS_PER_DAY
+
+
+def _get_rows(timestamps: Sequence[datetime]) -> np.ndarray:
+    """
+    Returns the hour-of-week, hour-of-day and global row of every timestamp,
+    as a (timestamps, 3) array.
+    """
+    hours = np.array([t.hour for t in timestamps], dtype=np.intp)
+    weekdays = np.array([t.weekday() for t in timestamps], dtype=np.intp)
+    return np.stack(
+        [
+            weekdays * _HOURS_PER_DAY + hours,
+            _DAILY_OFFSET + hours,
+            np.full(len(hours), _GLOBAL_ROW),
+        ],
+        axis=1,
+    )
+
+
+class SeasonalBaseline:
+    """
+    Z-score baseline per hour of the week, so the daily and weekly cycles of a
+    host are part of what is normal.
+
+    The mean and variance of every feature are kept in a compact index with a
+    row per hour of the week, a row per hour of the day and a row for all
+    samples. A sample is scored against the first of its rows that has seen
+    min_samples samples, so hours of the week not covered yet by the training
+    data fall back to the same hour of another day. .update() adds a sample to
+    its rows incrementally.
+
+    The method needs the timestamp of every sample, which Detector passes to
+    methods with uses_timestamps set.
+    """
+
+    uses_timestamps = True
+    decision_parameters = ("n", "threshold")
+
+    def __init__(self, n: int = 2, threshold: float = 3.0, min_samples: int = 100):
+        """
+        :param n: The number of features whose z-score must exceed the threshold.
+        :param min_samples: The number of samples a row of the index needs before
+                            samples are scored against it.
+        """
+        self.n = n
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.counts = None
+        self.means = None
+        self.m2 = None
+
+    def fit(self, X, timestamps: Sequence[datetime]):
+        n_rows = _GLOBAL_ROW + 1
+        rows = _get_rows(timestamps).ravel()
+        samples = np.repeat(X, 3, axis=0)
+
+        self.counts = np.bincount(rows, minlength=n_rows).astype(float)
+        sums = np.zeros((n_rows, X.shape[1]))
+        np.add.at(sums, rows, samples)
+        self.means = sums / np.maximum(self.counts, 1)[:, None]
+        self.m2 = np.zeros((n_rows, X.shape[1]))
+        np.add.at(self.m2, rows, (samples - self.means[rows]) ** 2)
+
+    def predict(self, X, timestamp: datetime) -> float:
+        if (self.z_scores(X, timestamp) > self.threshold).sum() >= self.n:
+            return 1.0
+        return 0.0
+
+    def update(self, X, timestamp: datetime) -> None:
+        """
+        Adds a sample to the running mean and variance of its rows (Welford).
+        """
+        rows = _get_rows([timestamp])[0]
+        self.counts[rows] += 1
+        delta = X - self.means[rows]
+        self.means[rows] += delta / self.counts[rows][:, None]
+        self.m2[rows] += delta * (X - self.means[rows])
+
+    @property
+    def score_threshold(self) -> float:
+        """
+        Returns the anomaly score above which a sample is an anomaly.
+        """
+        return self.threshold
+
+    def anomaly_scores(self, X, timestamps: Sequence[datetime]) -> np.ndarray:
+        """
+        Returns the n-th largest absolute z-score of every sample, which exceeds
+        the threshold exactly when .predict() reports an anomaly.
+        """
+        z = self._z_scores(X, self._baseline_rows(timestamps))
+        return np.sort(z, axis=1)[:, -min(self.n, z.shape[1])]
+
+    def z_scores(self, X, timestamp: datetime) -> np.ndarray:
+        """
+        Returns the absolute z-score of every feature against the baseline of the
+        timestamp.
+        """
+        return self._z_scores(X, self._baseline_rows([timestamp])[0])
+
+    def _baseline_rows(self, timestamps: Sequence[datetime]) -> np.ndarray:
+        """
+        Returns the first row of every timestamp that has seen min_samples samples,
+        or the global row.
+        """
+        rows = _get_rows(timestamps)
+        is_ready = self.counts[rows] >= self.min_samples
+        is_ready[:, -1] = True
+        return rows[np.arange(len(rows)), np.argmax(is_ready, axis=1)]
+
+    def _z_scores(self, X, rows) -> np.ndarray:
+        std = np.sqrt(self.m2[rows] / np.maximum(self.counts[rows], 1)[..., None])
+        std[std == 0] = 1
+        return np.abs((X - self.means[rows]) / std)
@@ -2,6 +2,8 @@ import numpy as np
 
 
 class ZScore:
+    decision_parameters = ("n", "threshold")
+
     def __init__(self, n: int = 2, threshold: float = 1.5):
         self.threshold = threshold
         self.n = n
@@ -19,3 +21,26 @@ class ZScore:
             return 1.0
 
         return 0.0
+
+    def predict_batch(self, X) -> np.ndarray:
+        """
+        Returns the prediction of every sample, like .predict() does for one.
+        """
+        z = np.abs((X - self.mean) / self.std)
+        return ((z > self.threshold).sum(axis=1) >= self.n).astype(float)
+
+    @property
+    def score_threshold(self) -> float:
+        """
+        Returns the anomaly score above which a sample is an anomaly.
+        """
+        return self.threshold
+
+    def anomaly_scores(self, X) -> np.ndarray:
+        """
+        Returns the n-th largest absolute z-score of every sample, which exceeds
+        the threshold exactly when .predict() reports an anomaly.
+        """
+        z = np.abs((X - self.mean) / self.std)
+        # An n above the number of features scores by the smallest z-score instead of failing.
+        return np.sort(z, axis=1)[:, -min(self.n, z.shape[1])]
@@ -1,13 +1,23 @@
 from datetime import datetime, timezone
 from enum import Enum
 import time
-import json
 from typing import get_args, Callable, Optional
 
+import numpy as np
+
 from . import database
 from .preprocessing import DataPreprocessor
 from .detector import Detector
-from .collection import MonitoredFeature, MonitoredFeatureCollector
+from .collection import (
+    FeatureSchedule,
+    MonitoredFeature,
+    MonitoredFeatureCollector,
+    ScheduledCollector,
+)
+from .features import DerivedFeature, FeatureEngineer
+from .sampling import AdaptiveSampler
+from .drift import DriftMonitor
+from .training_set import FifoTrainingSet, TrainingSet
 from logger import get_logger
 
 logger = get_logger(__name__)
@@ -23,11 +33,11 @@ class AnomalyDetectionModule:
     _DEFAULT_FEATURES_LIST: list[MonitoredFeature] = list(get_args(MonitoredFeature))
     _MIN_COLLECTION_INTERVAL_SECONDS: int = 3
 
-    _detectors: list[Detector] = []
+    _detectors: list[Detector]
     _detection_state: DetectionState = DetectionState.LEARNING
     _initial_learning_start_time: datetime
     _last_training_time: datetime
-    _telemetry_data: list[dict] = []
+    _training_set: TrainingSet
 
     def __init__(
         self,
@@ -39,19 +49,72 @@ class AnomalyDetectionModule:
         use_db: bool = False,
         db_url: str = "sqlite:///telemetry.db",
         alert_callback: Optional[Callable[[dict], None]] = None,
+        clock: Optional[Callable[[], datetime]] = None,
+        derived_features: Optional[list[DerivedFeature]] = None,
+        adaptive_sampler: Optional[AdaptiveSampler] = None,
+        feature_schedules: Optional[dict[MonitoredFeature, FeatureSchedule]] = None,
+        collection_cost_budget: Optional[float] = None,
+        drift_monitor: Optional[DriftMonitor] = None,
+        max_model_age_seconds: float = 86400,
+        training_set: Optional[TrainingSet] = None,
     ) -> None:
+        """
+        :param clock: An optional function returning the current time, used instead
+                      of the system clock, e.g. to replay recorded telemetry.
+        :param derived_features: Optional features derived from the monitored ones,
+                                 such as rates of counters or rolling statistics.
+                                 Detectors can select them by name like monitored features.
+        :param adaptive_sampler: If set, the collection interval adapts while detecting,
+                                 backing off on quiet hosts and speeding up on suspicion.
+        :param feature_schedules: If set, features are only collected when due, see
+                                  DEFAULT_FEATURE_SCHEDULES, and carry their last value otherwise.
+        :param collection_cost_budget: The highest cost of the scheduled features refreshed per tick.
+        :param drift_monitor: If set, the detectors are retrained when the features drift
+                              away from the training data instead of every retraining interval.
+        :param max_model_age_seconds: The longest time between retrainings with a drift monitor.
+        :param training_set: How the telemetry to train on is sampled, by default the most
+                             recent records, as many as were collected during initial learning.
+        """
         if collection_interval_seconds < self._MIN_COLLECTION_INTERVAL_SECONDS:
             raise ValueError(
                 f"Collection interval must be at least {self._MIN_COLLECTION_INTERVAL_SECONDS} seconds."
             )
+        if (
+            adaptive_sampler is not None
+            and adaptive_sampler.min_interval_seconds
+            < self._MIN_COLLECTION_INTERVAL_SECONDS
+        ):
+            raise ValueError(
+                f"Adaptive sampling interval must be at least {self._MIN_COLLECTION_INTERVAL_SECONDS} seconds."
+            )
 
         self._initial_learning_period_seconds = initial_learning_period_seconds
         self._retraining_interval_seconds = retraining_interval_seconds
         self._collection_interval_seconds = collection_interval_seconds
         self._detection_threshold = detection_threshold
         self._monitored_features = monitored_features
-        self._preprocessor = DataPreprocessor(monitored_features)
+        self._feature_engineer = FeatureEngineer(derived_features or [])
+        features = monitored_features + self._feature_engineer.names
+        self._preprocessor = DataPreprocessor(features)
+        self._features = features
+        self._feature_index = {feature: index for index, feature in enumerate(features)}
         self._alert_callback = alert_callback
+        self._adaptive_sampler = adaptive_sampler
+        self._drift_monitor = drift_monitor
+        self._max_model_age_seconds = max_model_age_seconds
+        self._scheduled_collector = (
+            ScheduledCollector(
+                monitored_features, feature_schedules, collection_cost_budget
+            )
+            if feature_schedules is not None
+            else None
+        )
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._last_predictions: list[float] = []
+        self._detectors = []
+        self._training_set = (
+            training_set if training_set is not None else FifoTrainingSet()
+        )
 
         self._use_db = use_db
         if self._use_db:
@@ -59,66 +122,129 @@ class AnomalyDetectionModule:
             logger.info("Database enabled. Using DB URL:", db_url)
 
     def add_detector(self, detector: Detector) -> None:
+        detector.compile(self._feature_index)
         self._detectors.append(detector)
 
     def process(self) -> None:
-        self._start_initial_learning()
+        self.start()
 
+        last_collection_time = self._initial_learning_start_time
         while True:
-            current_time = datetime.now(timezone.utc)
-            elapsed_time = current_time - self._initial_learning_start_time
+            current_time = self._clock()
+            elapsed_time = current_time - last_collection_time
             elapsed_time_seconds = elapsed_time.total_seconds()
 
-            if elapsed_time_seconds >= self._collection_interval_seconds:
-                telemetry = self._collect_telemetry()
-
-                # LEARNING state
-                if self._detection_state == DetectionState.LEARNING:
-                    learning_time = current_time - self._initial_learning_start_time
-                    learning_time_seconds = learning_time.total_seconds()
-
-                    if learning_time_seconds >= self._initial_learning_period_seconds:
-                        self._detection_state = DetectionState.TRAINING
-
-                    self._telemetry_data.append(telemetry)
-                    if self._use_db:
-                        self._write_to_db(telemetry)
-
-                # TRAINING state
-                elif self._detection_state == DetectionState.TRAINING:
-                    self._train()
-                    logger.info(
-                        f"Initial learning completed at {current_time}. Starting detection."
-                    )
-                    self._detection_state = DetectionState.DETECTING
-
-                # DETECTION state
-                elif self._detection_state == DetectionState.DETECTING:
-                    retraining_time = current_time - self._last_training_time
-                    retraining_time_seconds = retraining_time.total_seconds()
-
-                    if retraining_time_seconds >= self._retraining_interval_seconds:
-                        self._detection_state = DetectionState.TRAINING
-
-                    is_anomaly = self._predict(telemetry)
-                    if is_anomaly:
-                        logger.info(f"Anomaly detected at {current_time}.")
-                        if self._alert_callback:
-                            self._alert_callback(telemetry)
-                    else:
-                        self._telemetry_data.pop(0)
-                        self._telemetry_data.append(telemetry)
-                        if self._use_db:
-                            self._write_to_db(telemetry)
+            if elapsed_time_seconds >= self.collection_interval_seconds:
+                last_collection_time = current_time
+                self.tick()
 
             time.sleep(0.5)
 
+    def start(self) -> None:
+        """
+        Starts the initial learning at the current time of the module clock.
+        """
+        self._start_initial_learning()
+
+    def tick(self) -> Optional[bool]:
+        """
+        Collects the telemetry of the monitored features and advances the
+        detection state machine with it.
+        """
+        return self.step(self._collect_telemetry())
+
+    def step(self, telemetry: dict) -> Optional[bool]:
+        """
+        Advances the detection state machine by one tick with the given telemetry.
+
+        Returns whether the telemetry is an anomaly when it was checked in the
+        DETECTING state, and None otherwise.
+        """
+        current_time = self._clock()
+        is_anomaly = None
+        telemetry = self._feature_engineer.transform(telemetry)
+
+        # LEARNING state
+        if self._detection_state == DetectionState.LEARNING:
+            learning_time = current_time - self._initial_learning_start_time
+            learning_time_seconds = learning_time.total_seconds()
+
+            if learning_time_seconds >= self._initial_learning_period_seconds:
+                self._detection_state = DetectionState.TRAINING
+
+            self._training_set.add(telemetry)
+            if self._use_db:
+                self._write_to_db(telemetry)
+
+        # TRAINING state
+        elif self._detection_state == DetectionState.TRAINING:
+            self._train()
+            logger.info(
+                f"Initial learning completed at {current_time}. Starting detection."
+            )
+            self._detection_state = DetectionState.DETECTING
+
+        # DETECTION state
+        elif self._detection_state == DetectionState.DETECTING:
+            if self._should_retrain(current_time):
+                self._detection_state = DetectionState.TRAINING
+
+            normalized_telemetry = self._preprocessor.normalize_single_array(telemetry)
+            is_anomaly = self._predict(normalized_telemetry, telemetry["timestamp"])
+            if self._adaptive_sampler is not None:
+                self._adaptive_sampler.update(
+                    self._get_suspicions(normalized_telemetry, telemetry["timestamp"]),
+                    self._detection_threshold,
+                    is_anomaly,
+                )
+            if is_anomaly:
+                logger.info(f"Anomaly detected at {current_time}.")
+                if self._alert_callback:
+                    self._alert_callback(telemetry)
+            else:
+                self._update(normalized_telemetry, telemetry["timestamp"])
+                if self._drift_monitor is not None:
+                    self._drift_monitor.update(normalized_telemetry)
+                self._training_set.add(telemetry)
+                if self._use_db:
+                    self._write_to_db(telemetry)
+
+        return is_anomaly
+
+    @property
+    def collection_interval_seconds(self) -> float:
+        """
+        Returns the interval until the next collection, which only adapts while detecting.
+        """
+        if (
+            self._adaptive_sampler is not None
+            and self._detection_state == DetectionState.DETECTING
+        ):
+            return self._adaptive_sampler.interval_seconds
+        return self._collection_interval_seconds
+
+    @property
+    def detection_state(self) -> DetectionState:
+        return self._detection_state
+
+    @property
+    def last_predictions(self) -> list[float]:
+        """
+        Returns the prediction of every detector for the last checked telemetry.
+        """
+        return self._last_predictions
+
     def _collect_telemetry(self) -> dict:
         """
         Collects telemetry data of monitored features and returns it.
         """
+        if self._scheduled_collector is not None:
+            telemetry_data = self._scheduled_collector.collect(self._clock())
+            logger.info(f"Collected Data - {telemetry_data}")
+            return telemetry_data
+
         telemetry_data = {}
-        telemetry_data["timestamp"] = datetime.now(timezone.utc)
+        telemetry_data["timestamp"] = self._clock()
         for monitored_feature in self._monitored_features:
             telemetry_data[monitored_feature] = MonitoredFeatureCollector[
                 monitored_feature
@@ -130,22 +256,69 @@ class AnomalyDetectionModule:
         """
         Trains the detectors with the telemetry data.
         """
-        normalized_telemetry_data = self._preprocessor.normalize(self._telemetry_data)
+        samples = self._training_set.samples()
+        normalized_telemetry_data = self._preprocessor.normalize_array(samples)
+        timestamps = [sample["timestamp"] for sample in samples]
         for detector in self._detectors:
-            detector.fit(normalized_telemetry_data)
-        self._last_training_time = datetime.now(timezone.utc)
+            detector.fit_array(normalized_telemetry_data, timestamps)
+        if self._drift_monitor is not None:
+            self._drift_monitor.fit(normalized_telemetry_data)
+        self._last_training_time = self._clock()
+
+    def _should_retrain(self, current_time: datetime) -> bool:
+        """
+        Returns whether the detectors are due for retraining.
+        """
+        model_age_seconds = (current_time - self._last_training_time).total_seconds()
+        if self._drift_monitor is None:
+            return model_age_seconds >= self._retraining_interval_seconds
+
+        if model_age_seconds >= self._max_model_age_seconds:
+            logger.info("Retraining after reaching the maximum model age.")
+            return True
 
-    def _predict(self, telemetry: dict) -> bool:
-        normalized_telemetry = self._preprocessor.normalize_single(telemetry)
+        drifted_features = self._drift_monitor.drifted_features()
+        if drifted_features:
+            drift = ", ".join(
+                f"{self._features[feature]} (PSI {psi:.3f})"
+                for feature, psi in drifted_features.items()
+            )
+            logger.info(f"Retraining after drift in {drift}.")
+            return True
+        return False
+
+    def _predict(self, normalized_telemetry: np.ndarray, timestamp: datetime) -> bool:
         predictions_sum = 0
+        self._last_predictions = []
         for detector in self._detectors:
-            prediction = detector.predict(normalized_telemetry)
+            prediction = detector.predict_array(normalized_telemetry, timestamp)
             predictions_sum += prediction
+            self._last_predictions.append(prediction)
             logger.info(f"Prediction of {detector.get_name()} - {prediction}")
         is_anomaly = predictions_sum >= self._detection_threshold
         logger.info(f"Anomaly: {is_anomaly}")
         return is_anomaly
 
+    def _get_suspicions(
+        self, normalized_telemetry: np.ndarray, timestamp: datetime
+    ) -> list[float]:
+        """
+        Returns how close every detector is to its threshold, falling back to the
+        last prediction of detectors whose method has no anomaly scores.
+        """
+        suspicions = []
+        for detector, prediction in zip(self._detectors, self._last_predictions):
+            ratio = detector.score_ratio(normalized_telemetry, timestamp)
+            suspicions.append(prediction if ratio is None else ratio)
+        return suspicions
+
+    def _update(self, normalized_telemetry: np.ndarray, timestamp: datetime) -> None:
+        """
+        Updates the incremental detectors with a sample that was not an anomaly.
+        """
+        for detector in self._detectors:
+            detector.update_array(normalized_telemetry, timestamp)
+
     def _write_to_db(self, telemetry_data: dict) -> None:
         """
         Writes telemetry data into the database as a new record.
@@ -156,10 +329,7 @@ class AnomalyDetectionModule:
         try:
             record = TelemetryData(
                 timestamp=telemetry_data["timestamp"],
-                data=json.dumps(
-                    telemetry_data,
-                    default=lambda o: o.isoformat() if hasattr(o, "isoformat") else o,
-                ),
+                data=database.serialize_telemetry(telemetry_data),
             )
             session.add(record)
             session.commit()
@@ -173,5 +343,5 @@ class AnomalyDetectionModule:
     def _start_initial_learning(self) -> None:
         if self._detection_state != DetectionState.LEARNING:
             raise Exception("Initial learning can only be started in LEARNING state.")
-        self._initial_learning_start_time = datetime.now(timezone.utc)
+        self._initial_learning_start_time = self._clock()
         logger.info(f"Initial learning started at {self._initial_learning_start_time}")
@@ -1,9 +1,12 @@
 import copy
-from typing import Any
+import numpy as np
 
 from .providers.cpu import get_cpu_min_speed, get_cpu_max_speed
 from .collection import MonitoredFeature
 
+# Features that are already reported in the [0, 1] range and are not rescaled.
+_PASSTHROUGH_FEATURES = ["cpu_usage", "ram_usage", "vram_usage"]
+
 
 class CriticalValue:
     def __init__(self, min: float, max: float) -> None:
@@ -17,6 +20,23 @@ class DataPreprocessor:
     def __init__(self, monitored_features: list[MonitoredFeature]) -> None:
         self._monitored_features = monitored_features
         self._monitored_features_critical_values = {}
+        self._passthrough_mask = np.array(
+            [feature in _PASSTHROUGH_FEATURES for feature in monitored_features],
+            dtype=bool,
+        )
+        self._lower_bounds = np.zeros(len(monitored_features))
+        self._upper_bounds = np.zeros(len(monitored_features))
+
+    def to_array(self, telemetry_data: list[dict]) -> np.ndarray:
+        """
+        Project telemetry records onto a (samples, features) array whose columns
+        follow the order of the monitored features.
+        """
+        rows = [
+            [telemetry[feature] for feature in self._monitored_features]
+            for telemetry in telemetry_data
+        ]
+        return np.array(rows, dtype=float).reshape(-1, len(self._monitored_features))
 
     def normalize(self, telemetry_data: list[dict]) -> list[dict]:
         """
@@ -31,15 +51,57 @@ class DataPreprocessor:
         if len(normalized_data) == 0:
             return normalized_data
 
-        # Determine the critical (min, max) values for each monitored feature.
-        for feature in self._monitored_features:
-            min_value = normalized_data[0][feature]
-            max_value = normalized_data[0][feature]
-            for telemetry in normalized_data:
-                min_value = min(min_value, telemetry[feature])
-                max_value = max(max_value, telemetry[feature])
+        normalized_array = self.normalize_array(normalized_data)
+
+        # Normalize each telemetry record in the copied data.
+        for telemetry, normalized_row in zip(normalized_data, normalized_array):
+            for feature, value in zip(self._monitored_features, normalized_row):
+                telemetry[feature] = float(value)
+
+        return normalized_data
+
+    def normalize_single(self, telemetry: dict) -> dict:
+        """
+        Normalize a single telemetry data point using min-max normalization.
+
+        Instead of modifying the input telemetry, this method creates a deep copy,
+        normalizes the copy, and returns it.
+        """
+        telemetry_copy = copy.deepcopy(telemetry)
+        normalized_row = self.normalize_single_array(telemetry)
+        for feature, value in zip(self._monitored_features, normalized_row):
+            telemetry_copy[feature] = float(value)
+        return telemetry_copy
+
+    def normalize_array(self, telemetry_data: list[dict]) -> np.ndarray:
+        """
+        Fit the critical values on the telemetry data and return it normalized
+        as a (samples, features) array in monitored features order.
+        """
+        data = self.to_array(telemetry_data)
+
+        if len(data) == 0:
+            return data
+
+        self._fit_critical_values(data)
+        return self._normalize_array(data)
+
+    def normalize_single_array(self, telemetry: dict) -> np.ndarray:
+        """
+        Normalize a single telemetry data point into a row in monitored features order.
+        """
+        return self._normalize_array(self.to_array([telemetry]))[0]
+
+    def _fit_critical_values(self, data: np.ndarray) -> None:
+        """
+        Determine the critical (min, max) values for each monitored feature and
+        compile them into the bounds used by the normalization.
+        """
+        min_values = data.min(axis=0)
+        max_values = data.max(axis=0)
+        for i, feature in enumerate(self._monitored_features):
             self._monitored_features_critical_values[feature] = CriticalValue(
-                min_value, max_value
+                float(min_values[i]), float(max_values[i])
             )
 
         if "cpu_speed" in self._monitored_features:
@@ -69,38 +131,18 @@ class DataPreprocessor:
                 0.0, 7500.0
             )
 
-        # Normalize each telemetry record in the copied data.
-        for telemetry in normalized_data:
-            for feature in self._monitored_features:
-                telemetry[feature] = self._normalize_feature(
-                    feature, telemetry[feature]
-                )
-
-        return normalized_data
-
-    def normalize_single(self, telemetry: dict) -> dict:
-        """
-        Normalize a single telemetry data point using min-max normalization.
-
-        Instead of modifying the input telemetry, this method creates a deep copy,
-        normalizes the copy, and returns it.
-        """
-        telemetry_copy = copy.deepcopy(telemetry)
-        for feature in self._monitored_features:
-            telemetry_copy[feature] = self._normalize_feature(
-                feature, telemetry_copy[feature]
+        for i, feature in enumerate(self._monitored_features):
+            critical_value = self._monitored_features_critical_values[feature]
+            self._lower_bounds[i], self._upper_bounds[i] = self._get_bounds(
+                critical_value
             )
-        return telemetry_copy
 
-    def _normalize_feature(self, feature: MonitoredFeature, value: Any) -> float:
+    def _get_bounds(self, critical_value: CriticalValue) -> tuple[float, float]:
         """
-        Normalize the given feature value using min-max normalization.
+        Widen the critical values of a feature into the normalization bounds.
         """
-        if feature in ["cpu_usage", "ram_usage", "vram_usage"]:
-            return value
-
-        min_value = self._monitored_features_critical_values[feature].min
-        max_value = self._monitored_features_critical_values[feature].max
+        min_value = critical_value.min
+        max_value = critical_value.max
 
         # Take 20% of the range as the buffer to avoid normalization errors.
         min_value -= 0.25 * (max_value - min_value)
@@ -110,16 +152,18 @@ class DataPreprocessor:
         if min_value < 0:
             min_value = 0
 
-        # Avoid division by zero in case min_value == max_value.
-        if max_value == min_value:
-            return 0.0
-
-        res = (value - min_value) / (max_value - min_value)
+        return min_value, max_value
 
-        if res < 0:
-            return 0.0
+    def _normalize_array(self, data: np.ndarray) -> np.ndarray:
+        """
+        Normalize a (samples, features) array using min-max normalization.
+        """
+        span = self._upper_bounds - self._lower_bounds
 
-        if res > 1:
-            return 1.0
+        # Avoid division by zero in case min_value == max_value.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            res = (data - self._lower_bounds) / span
+        res = np.where(span == 0, 0.0, np.clip(res, 0.0, 1.0))
 
+        res[:, self._passthrough_mask] = data[:, self._passthrough_mask]
         return res
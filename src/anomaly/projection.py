@@ -0,0 +1,116 @@
+from typing import Optional
+
+import numpy as np
+from sklearn.decomposition import IncrementalPCA
+
+
+class PCAProjection:
+    """
+    Projects samples onto the principal components of the training data, so
+    that detectors fed with many correlated features fit and score in fewer
+    dimensions.
+
+    The components are fitted with incremental PCA, one batch of batch_size
+    samples at a time, so the memory and time of a fit stay bounded however
+    large the training data is, and .partial_fit() refines them with new
+    batches. The number of kept components is either fixed by n_components or
+    the smallest that explains the explained_variance share of the variance.
+
+    Anomalies that break the correlations between the features mostly move
+    samples along the dropped components, so with include_residual the
+    distance of a sample to its reconstruction is appended as one more
+    feature, which keeps them visible to the detector.
+    """
+
+    def __init__(
+        self,
+        n_components: Optional[int] = None,
+        explained_variance: float = 0.99,
+        batch_size: int = 1000,
+        whiten: bool = False,
+        include_residual: bool = True,
+    ) -> None:
+        """
+        :param n_components: The number of components to keep. If None, it is
+                             chosen from explained_variance on every fit.
+        :param explained_variance: The share of the variance the kept components
+                                   must explain when n_components is None.
+        :param batch_size: The number of samples of every incremental PCA batch.
+        :param whiten: If True, the components are scaled to unit variance.
+        :param include_residual: If True, the distance to the reconstruction from the
+                                 kept components is appended to every projection.
+        """
+        self.n_components = n_components
+        self.explained_variance = explained_variance
+        self.batch_size = batch_size
+        self.whiten = whiten
+        self.include_residual = include_residual
+        self.pca: Optional[IncrementalPCA] = None
+        self.n_kept = None
+        self.mean = None
+        self.components = None
+        self.explained_variance_ratio = None
+        self._scale = None
+
+    def fit(self, X: np.ndarray) -> "PCAProjection":
+        """
+        Fits the components from scratch, in batches of at least batch_size samples.
+        """
+        # Every batch needs at least as many samples as there are components.
+        n_batches = max(len(X) // self.batch_size, 1)
+        self.pca = IncrementalPCA(n_components=min(X.shape[1], len(X) // n_batches))
+        self.n_kept = None
+        for batch in np.array_split(X, n_batches):
+            self.pca.partial_fit(batch)
+        self._select_components()
+        return self
+
+    def partial_fit(self, X: np.ndarray) -> None:
+        """
+        Refines the components with a batch of samples, keeping their number.
+        """
+        self.pca.partial_fit(X)
+        self._select_components()
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """
+        Returns the projection of a sample, or of every row of a (samples, features) array.
+        """
+        centered = X - self.mean
+        projected = centered @ self.components.T
+        if self.include_residual:
+            residual = centered - projected @ self.components
+            distance = np.sqrt(np.sum(residual**2, axis=-1))
+        if self.whiten:
+            projected /= self._scale
+        if self.include_residual:
+            return np.concatenate([projected, np.expand_dims(distance, -1)], axis=-1)
+        return projected
+
+    def reconstruction_errors(self, X: np.ndarray) -> np.ndarray:
+        """
+        Returns the squared distance of a sample, or of every row of a (samples,
+        features) array, to its reconstruction from the kept components.
+        """
+        centered = X - self.mean
+        residual = centered - (centered @ self.components.T) @ self.components
+        return np.sum(residual**2, axis=-1)
+
+    def _select_components(self) -> None:
+        ratios = self.pca.explained_variance_ratio_
+        if self.n_kept is None:
+            if self.n_components is not None:
+                self.n_kept = min(self.n_components, len(ratios))
+            else:
+                self.n_kept = min(
+                    int(np.searchsorted(np.cumsum(ratios), self.explained_variance))
+                    + 1,
+                    len(ratios),
+                )
+
+        self.mean = self.pca.mean_
+        self.components = self.pca.components_[: self.n_kept]
+        self.explained_variance_ratio = ratios[: self.n_kept]
+        scale = np.sqrt(self.pca.explained_variance_[: self.n_kept])
+        scale[scale == 0] = 1
+        self._scale = scale
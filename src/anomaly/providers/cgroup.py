@@ -0,0 +1,153 @@
+import os
+import re
+import time
+
+import numpy as np
+
+CGROUP_FEATURES = [
+    "cpu_usage_usec",
+    "cpu_throttled_usec",
+    "memory_current",
+    "io_read_bytes",
+    "io_write_bytes",
+    "pids_current",
+]
+
+# The features that are cumulative counters, the others are current values.
+CGROUP_COUNTER_FEATURES = [
+    "cpu_usage_usec",
+    "cpu_throttled_usec",
+    "io_read_bytes",
+    "io_write_bytes",
+]
+
+# The leaf cgroups of containers, as created by the systemd and cgroupfs drivers of
+# Docker, containerd and CRI-O, e.g. cri-containerd-<id>.scope or kubepods/.../<id>.
+_CONTAINER_CGROUP = re.compile(
+    r"^(?:docker-|cri-containerd-|crio-|libpod-)?([0-9a-f]{64})(?:\.scope)?$"
+)
+
+
+def _read_file(path: str, optional: bool = False) -> bytes:
+    """
+    Returns the content of the file, or nothing for a missing optional file,
+    such as the files of a controller that is not enabled for the cgroup.
+    """
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        if optional:
+            return b""
+        raise
+
+
+def _read_cpu_stat(path: str) -> tuple[float, float]:
+    """
+    Returns the total and the throttled CPU time in microseconds.
+    """
+    usage = throttled = 0.0
+    for line in _read_file(os.path.join(path, "cpu.stat")).splitlines():
+        key, value = line.split()
+        if key == b"usage_usec":
+            usage = float(value)
+        elif key == b"throttled_usec":
+            throttled = float(value)
+    return usage, throttled
+
+
+def _read_io_stat(path: str) -> tuple[float, float]:
+    """
+    Returns the bytes read and written, summed over every device.
+    """
+    read_bytes = write_bytes = 0.0
+    for line in _read_file(os.path.join(path, "io.stat"), optional=True).splitlines():
+        for field in line.split()[1:]:
+            key, _, value = field.partition(b"=")
+            if key == b"rbytes":
+                read_bytes += float(value)
+            elif key == b"wbytes":
+                write_bytes += float(value)
+    return read_bytes, write_bytes
+
+
+def _read_single_value(path: str, file_name: str) -> float:
+    value = _read_file(os.path.join(path, file_name), optional=True).strip()
+    # pids.max and memory.max style files may hold "max" instead of a number.
+    return float(value) if value.isdigit() else 0.0
+
+
+class CgroupStatsReader:
+    """
+    Reads the cgroup v2 statistics of every container on the node in one sweep.
+
+    The container cgroups are found by walking the hierarchy, which is only
+    repeated every rediscover_interval_seconds or when a container disappears.
+    Every cgroup has a cpu.stat, the statistics of controllers that are not
+    enabled for a container are reported as 0.
+    """
+
+    def __init__(
+        self, root: str = "/sys/fs/cgroup", rediscover_interval_seconds: float = 30.0
+    ) -> None:
+        self._root = root
+        self._rediscover_interval_seconds = rediscover_interval_seconds
+        self._containers: dict[str, str] = {}
+        self._last_discovery_time = None
+
+    def discover(self) -> dict[str, str]:
+        """
+        Returns the cgroup path of every container, by container id.
+        """
+        containers = {}
+        for path, directories, _ in os.walk(self._root):
+            match = _CONTAINER_CGROUP.match(os.path.basename(path))
+            if match:
+                containers[match.group(1)] = path
+                # The cgroups nested in a container belong to it.
+                directories.clear()
+        self._containers = containers
+        self._last_discovery_time = time.monotonic()
+        return containers
+
+    def read(self) -> tuple[list[str], np.ndarray]:
+        """
+        Returns the ids of the containers and their CGROUP_FEATURES as a
+        (containers, features) array.
+        """
+        if (
+            self._last_discovery_time is None
+            or time.monotonic() - self._last_discovery_time
+            >= self._rediscover_interval_seconds
+        ):
+            self.discover()
+
+        container_ids = []
+        rows = []
+        for container_id, path in self._containers.items():
+            try:
+                cpu_usage, cpu_throttled = _read_cpu_stat(path)
+                memory_current = _read_single_value(path, "memory.current")
+                io_read, io_write = _read_io_stat(path)
+                pids_current = _read_single_value(path, "pids.current")
+            except FileNotFoundError:
+                # Without a cpu.stat, the container stopped since the last discovery.
+                self._last_discovery_time = None
+                continue
+            except OSError:
+                continue
+
+            container_ids.append(container_id)
+            rows.append(
+                (
+                    cpu_usage,
+                    cpu_throttled,
+                    memory_current,
+                    io_read,
+                    io_write,
+                    pids_current,
+                )
+            )
+        return container_ids, np.array(rows, dtype=float).reshape(
+            -1, len(CGROUP_FEATURES)
+        )
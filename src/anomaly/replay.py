@@ -0,0 +1,136 @@
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+import pandas as pd
+
+from . import database
+from .module import AnomalyDetectionModule, DetectionState
+
+
+class SimulatedClock:
+    """
+    A virtual clock that only moves when it is set, used to drive an
+    AnomalyDetectionModule through recorded telemetry without real sleeps.
+    """
+
+    def __init__(self, start: Optional[datetime] = None) -> None:
+        self._now = start or datetime.fromtimestamp(0, timezone.utc)
+
+    def __call__(self) -> datetime:
+        return self._now
+
+    def set(self, now: datetime) -> None:
+        self._now = now
+
+
+class TickDecision(NamedTuple):
+    timestamp: datetime
+    state: DetectionState
+    is_anomaly: Optional[bool]
+    predictions: list[float]
+
+
+class ReplayReport:
+    def __init__(self, ticks: list[TickDecision], elapsed_seconds: float) -> None:
+        self.ticks = ticks
+        self.elapsed_seconds = elapsed_seconds
+
+    @property
+    def alerts(self) -> list[datetime]:
+        """
+        Returns the timestamps of the ticks reported as anomalies.
+        """
+        return [tick.timestamp for tick in self.ticks if tick.is_anomaly]
+
+    @property
+    def samples_per_second(self) -> float:
+        if self.elapsed_seconds == 0:
+            return float("inf")
+        return len(self.ticks) / self.elapsed_seconds
+
+    def summary(self) -> str:
+        return (
+            f"Replayed {len(self.ticks)} samples in {self.elapsed_seconds:.2f}s "
+            f"({self.samples_per_second:.0f} samples/sec), "
+            f"{len(self.alerts)} alerts."
+        )
+
+
+def replay(
+    module: AnomalyDetectionModule,
+    clock: SimulatedClock,
+    telemetry_data: Iterable[dict],
+    quiet: bool = True,
+) -> ReplayReport:
+    """
+    Feeds recorded telemetry through the module's state machine, moving the
+    simulated clock to the timestamp of every sample.
+
+    :param module: A module created with clock=clock.
+    :param clock: The simulated clock driving the module.
+    :param telemetry_data: Telemetry records ordered by their "timestamp".
+    :param quiet: Silence the per-tick info logs of the module while replaying.
+    """
+    module_logger = logging.getLogger(AnomalyDetectionModule.__module__)
+    previous_level = module_logger.level
+    if quiet:
+        module_logger.setLevel(logging.WARNING)
+
+    ticks = []
+    started = False
+    start_time = time.perf_counter()
+    try:
+        for telemetry in telemetry_data:
+            clock.set(telemetry["timestamp"])
+            if not started:
+                module.start()
+                started = True
+
+            state = module.detection_state
+            is_anomaly = module.step(telemetry)
+            predictions = module.last_predictions if is_anomaly is not None else []
+            ticks.append(
+                TickDecision(telemetry["timestamp"], state, is_anomaly, predictions)
+            )
+    finally:
+        module_logger.setLevel(previous_level)
+
+    return ReplayReport(ticks, time.perf_counter() - start_time)
+
+
+def read_csv_telemetry(
+    path: str, column_map: Optional[dict[str, str]] = None
+) -> Iterator[dict]:
+    """
+    Reads telemetry records from a CSV file with a "timestamp" column.
+
+    :param column_map: An optional mapping from CSV column names to feature names,
+                       e.g. {"disk_reads": "disk_read_bytes"}.
+    """
+    data_frame = pd.read_csv(path).rename(columns=column_map or {})
+    data_frame["timestamp"] = pd.to_datetime(
+        data_frame["timestamp"], utc=True
+    ).dt.floor("us")
+    for record in data_frame.to_dict("records"):
+        record["timestamp"] = record["timestamp"].to_pydatetime()
+        yield record
+
+
+def read_db_telemetry(db_url: str) -> Iterator[dict]:
+    """
+    Reads the telemetry records written by a module with use_db=True.
+    """
+    session = database.init_db(db_url)()
+    try:
+        query = session.query(database.TelemetryData).order_by(
+            database.TelemetryData.timestamp
+        )
+        for record in query.yield_per(1000):
+            telemetry = json.loads(record.data)
+            telemetry["timestamp"] = datetime.fromisoformat(telemetry["timestamp"])
+            yield telemetry
+    finally:
+        session.close()
@@ -0,0 +1,61 @@
+class AdaptiveSampler:
+    """
+    Chooses the collection interval from how close the detectors are to an alert.
+
+    The suspicion of every detector is how far its anomaly score has moved from
+    the typical training score towards its threshold, from 0 to 1, or its 0/1
+    prediction for methods without anomaly scores. While the sum of the
+    suspicions stays below suspicion_ratio of the detection threshold, the
+    interval backs off geometrically towards max_interval_seconds. As soon as
+    it reaches it, a single detector reaches its threshold, or an anomaly is
+    reported, the interval jumps back to min_interval_seconds, so scores
+    approaching the thresholds tighten the sampling before the alert fires.
+
+    Detectors should rely on time-normalized features, such as the Rate and
+    Ewma derived features, so that their inputs do not change with the interval.
+    """
+
+    def __init__(
+        self,
+        min_interval_seconds: float = 3,
+        max_interval_seconds: float = 60,
+        backoff_factor: float = 1.5,
+        suspicion_ratio: float = 0.5,
+    ) -> None:
+        if min_interval_seconds > max_interval_seconds:
+            raise ValueError("Minimum interval must not exceed the maximum interval.")
+
+        self.min_interval_seconds = min_interval_seconds
+        self.max_interval_seconds = max_interval_seconds
+        self.backoff_factor = backoff_factor
+        self.suspicion_ratio = suspicion_ratio
+        self.interval_seconds = min_interval_seconds
+
+    def update(
+        self, suspicions: list[float], detection_threshold: float, is_anomaly: bool
+    ) -> float:
+        """
+        Updates the interval with the suspicions of the detectors on the last tick
+        and returns it.
+        """
+        suspicion = (
+            sum(min(s, 1.0) for s in suspicions) / detection_threshold
+            if detection_threshold
+            else 1
+        )
+        # With a large detection threshold, one detector at its threshold barely
+        # moves the sum, but is suspicious on its own.
+        if (
+            is_anomaly
+            or suspicion >= self.suspicion_ratio
+            or max(suspicions, default=0.0) >= 1
+        ):
+            self.interval_seconds = self.min_interval_seconds
+        else:
+            self.interval_seconds = min(
+                self.interval_seconds * self.backoff_factor, self.max_interval_seconds
+            )
+        return self.interval_seconds
+
+    def reset(self) -> None:
+        self.interval_seconds = self.min_interval_seconds
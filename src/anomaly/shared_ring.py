@@ -0,0 +1,193 @@
+from multiprocessing import shared_memory
+from typing import Optional, Sequence
+
+import numpy as np
+
+_HEADER_DTYPE = np.dtype(
+    [
+        ("write_sequence", "<i8"),
+        ("generation", "<i8"),
+        ("closed", "<i8"),
+        ("n_features", "<i8"),
+        ("capacity", "<i8"),
+    ]
+)
+
+
+def _get_slot_dtype(n_features: int) -> np.dtype:
+    return np.dtype(
+        [("sequence", "<i8"), ("timestamp", "<f8"), ("values", "<f8", (n_features,))]
+    )
+
+
+class SharedRing:
+    """
+    A ring buffer of fixed-width telemetry samples in shared memory, written by
+    a single collector process and read by any number of detector processes.
+
+    Every slot holds the sequence number of its sample, the timestamp and the
+    values. The writer invalidates the sequence number of a slot before it
+    overwrites it and sets it last, so a reader that copied a slot can tell
+    from the sequence number whether it was overwritten meanwhile. The writer
+    never waits for the readers, a reader that falls a full ring behind skips
+    the samples it lost.
+    """
+
+    def __init__(
+        self, memory: shared_memory.SharedMemory, n_features: int, capacity: int
+    ) -> None:
+        self._memory = memory
+        self._header = np.ndarray((), dtype=_HEADER_DTYPE, buffer=memory.buf)
+        self.slots = np.ndarray(
+            (capacity,),
+            dtype=_get_slot_dtype(n_features),
+            buffer=memory.buf,
+            offset=_HEADER_DTYPE.itemsize,
+        )
+        self.n_features = n_features
+        self.capacity = capacity
+
+    @classmethod
+    def create(
+        cls, n_features: int, capacity: int = 4096, name: Optional[str] = None
+    ) -> "SharedRing":
+        size = _HEADER_DTYPE.itemsize + capacity * _get_slot_dtype(n_features).itemsize
+        memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+        ring = cls(memory, n_features, capacity)
+        ring._header[()] = (0, 0, 0, n_features, capacity)
+        ring.slots["sequence"] = -1
+        return ring
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedRing":
+        """
+        Attaches to a ring created by another process, which remains its owner.
+        """
+        memory = shared_memory.SharedMemory(name=name)
+        header = np.ndarray((), dtype=_HEADER_DTYPE, buffer=memory.buf)
+        n_features, capacity = int(header["n_features"]), int(header["capacity"])
+        del header
+        return cls(memory, n_features, capacity)
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    @property
+    def write_sequence(self) -> int:
+        """
+        Returns the sequence number the next sample will be written with.
+        """
+        return int(self._header["write_sequence"])
+
+    @property
+    def generation(self) -> int:
+        """
+        Returns how many writers have started on the ring, which grows when the collector restarts.
+        """
+        return int(self._header["generation"])
+
+    @property
+    def closed(self) -> bool:
+        return bool(self._header["closed"])
+
+    def begin_writing(self) -> int:
+        """
+        Registers a new writer, which continues the sequence of the previous one,
+        and returns its generation.
+        """
+        self._header["generation"] += 1
+        return self.generation
+
+    def write(self, timestamp: float, values: Sequence[float]) -> int:
+        """
+        Writes a sample into the next slot and returns its sequence number.
+        """
+        sequence = self.write_sequence
+        slot = self.slots[sequence % self.capacity]
+        slot["sequence"] = -1
+        slot["timestamp"] = timestamp
+        slot["values"] = values
+        slot["sequence"] = sequence
+        self._header["write_sequence"] = sequence + 1
+        return sequence
+
+    def mark_closed(self) -> None:
+        """
+        Tells the processes using the ring to stop.
+        """
+        self._header["closed"] = 1
+
+    def reader(self, from_oldest: bool = False) -> "RingReader":
+        """
+        Returns a reader of the samples written from now on, or of every sample
+        still in the ring with from_oldest.
+        """
+        return RingReader(self, from_oldest)
+
+    def close(self) -> None:
+        """
+        Detaches this process from the ring.
+        """
+        # The views must be released before the memory can be closed.
+        del self._header, self.slots
+        self._memory.close()
+
+    def unlink(self) -> None:
+        """
+        Frees the ring, called by its owner once every process has closed it.
+        """
+        self._memory.unlink()
+
+
+class RingReader:
+    """
+    Reads the new samples of a SharedRing as views of the shared memory.
+    """
+
+    def __init__(self, ring: SharedRing, from_oldest: bool = False) -> None:
+        self._ring = ring
+        self.next_sequence = ring.write_sequence
+        if from_oldest:
+            self.next_sequence = max(self.next_sequence - ring.capacity + 1, 0)
+        self.lost = 0
+        self._rows = ring.slots[:0]
+        self._first_sequence = self.next_sequence
+
+    def read(self, max_rows: Optional[int] = None) -> np.ndarray:
+        """
+        Returns the next unread samples that are contiguous in the ring as a view
+        of the shared memory, without copying them.
+
+        The writer overwrites a returned slot once it is a full ring ahead, so
+        after the values of a row have been used, is_valid() must confirm that
+        they were not overwritten meanwhile.
+        """
+        ring = self._ring
+        write_sequence = ring.write_sequence
+        # The slot of the oldest sample may be being overwritten right now.
+        oldest_sequence = write_sequence - ring.capacity + 1
+        if self.next_sequence < oldest_sequence:
+            self.lost += oldest_sequence - self.next_sequence
+            self.next_sequence = oldest_sequence
+
+        start = self.next_sequence % ring.capacity
+        n_rows = min(write_sequence - self.next_sequence, ring.capacity - start)
+        if max_rows is not None:
+            n_rows = min(n_rows, max_rows)
+        n_rows = max(n_rows, 0)
+
+        self._rows = ring.slots[start : start + n_rows]
+        self._first_sequence = self.next_sequence
+        self.next_sequence += n_rows
+        return self._rows
+
+    def is_valid(self, index: int) -> bool:
+        """
+        Returns whether the row at the index of the last read still holds the
+        sample it was read for, counting it as lost otherwise.
+        """
+        if self._rows[index]["sequence"] == self._first_sequence + index:
+            return True
+        self.lost += 1
+        return False
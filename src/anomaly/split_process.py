@@ -0,0 +1,255 @@
+import logging
+import multiprocessing
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from .collection import FeatureSchedule, MonitoredFeature, ScheduledCollector
+from .module import AnomalyDetectionModule
+from .replay import SimulatedClock
+from .shared_ring import SharedRing
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+ModuleFactory = Callable[[Callable[[], datetime]], AnomalyDetectionModule]
+
+
+def _sleep_until(ring: SharedRing, deadline: float) -> None:
+    # Sleeps in short steps, so a closed ring is noticed quickly.
+    while not ring.closed:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(min(remaining, 0.25))
+
+
+def _run_collector(
+    ring_name: str,
+    monitored_features: list[MonitoredFeature],
+    collection_interval_seconds: float,
+    feature_schedules: Optional[dict[MonitoredFeature, FeatureSchedule]],
+) -> None:
+    """
+    Collects the telemetry every interval and writes it into the ring, never
+    waiting for the detectors.
+    """
+    ring = SharedRing.attach(ring_name)
+    collector = ScheduledCollector(monitored_features, feature_schedules or {})
+    generation = ring.begin_writing()
+    logger.info(f"Collector {generation} writing from sample {ring.write_sequence}.")
+    try:
+        next_collection_time = time.monotonic()
+        while not ring.closed:
+            telemetry = collector.collect(datetime.now(timezone.utc))
+            ring.write(
+                telemetry["timestamp"].timestamp(),
+                [float(telemetry[feature]) for feature in monitored_features],
+            )
+            next_collection_time += collection_interval_seconds
+            # A collection that overran its interval is not made up for.
+            next_collection_time = max(next_collection_time, time.monotonic())
+            _sleep_until(ring, next_collection_time)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.close()
+
+
+def _run_detector(
+    ring_name: str,
+    module_factory: ModuleFactory,
+    monitored_features: list[MonitoredFeature],
+    poll_interval_seconds: float,
+    log_level: int,
+) -> None:
+    """
+    Steps a module through every sample written into the ring, on a clock set
+    to the sample timestamps.
+    """
+    logging.getLogger(AnomalyDetectionModule.__module__).setLevel(log_level)
+    ring = SharedRing.attach(ring_name)
+    reader = ring.reader()
+    clock = SimulatedClock()
+    module = module_factory(clock)
+    started = False
+    rows = row = None
+    logger.info(f"Detector reading from sample {reader.next_sequence}.")
+    try:
+        while not ring.closed:
+            rows = reader.read()
+            if len(rows) == 0:
+                time.sleep(poll_interval_seconds)
+                continue
+
+            for index, row in enumerate(rows):
+                telemetry = {
+                    "timestamp": datetime.fromtimestamp(
+                        float(row["timestamp"]), timezone.utc
+                    )
+                }
+                telemetry.update(zip(monitored_features, row["values"].tolist()))
+                if not reader.is_valid(index):
+                    continue
+
+                clock.set(telemetry["timestamp"])
+                if not started:
+                    module.start()
+                    started = True
+                module.step(telemetry)
+
+            if reader.lost:
+                logger.warning(
+                    f"Detector fell behind the collector and lost {reader.lost} samples."
+                )
+                reader.lost = 0
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # The views of the ring must be released before it can be closed.
+        rows = row = reader = None
+        ring.close()
+
+
+class SplitProcessRunner:
+    """
+    Runs the collection and the detection in separate processes, connected by
+    a SharedRing, so blocking sensor calls and heavy scoring do not compete
+    for the same GIL.
+
+    A single collector process writes a sample every collection interval and
+    every module runs in its own detector process, reading the samples as they
+    arrive. A slow collector only leaves the detectors idle, and a slow
+    detector skips samples once it falls a full ring behind instead of delaying
+    the collection. Processes that die are restarted: a restarted collector
+    continues the sample sequence, and a restarted detector starts over with a
+    new module from the newest sample.
+    """
+
+    def __init__(
+        self,
+        module_factories: list[ModuleFactory],
+        monitored_features: list[MonitoredFeature],
+        collection_interval_seconds: float = 5,
+        feature_schedules: Optional[dict[MonitoredFeature, FeatureSchedule]] = None,
+        capacity: int = 4096,
+        poll_interval_seconds: float = 0.1,
+        detector_log_level: int = logging.INFO,
+    ) -> None:
+        """
+        :param module_factories: Picklable functions returning the module of every detector
+                                 process, given the clock the module must use.
+        :param feature_schedules: Optional per-feature schedules of the collector.
+        :param capacity: The number of samples the ring holds.
+        :param poll_interval_seconds: How long an idle detector waits before polling again.
+        """
+        self._module_factories = module_factories
+        self._monitored_features = monitored_features
+        self._collection_interval_seconds = collection_interval_seconds
+        self._feature_schedules = feature_schedules
+        self._capacity = capacity
+        self._poll_interval_seconds = poll_interval_seconds
+        self._detector_log_level = detector_log_level
+
+        self._ring: Optional[SharedRing] = None
+        self._collector: Optional[multiprocessing.Process] = None
+        self._detectors: list[Optional[multiprocessing.Process]] = []
+
+    @property
+    def ring(self) -> Optional[SharedRing]:
+        return self._ring
+
+    def start(self) -> None:
+        self._ring = SharedRing.create(len(self._monitored_features), self._capacity)
+        self._collector = self._start_collector()
+        self._detectors = [
+            self._start_detector(module_factory)
+            for module_factory in self._module_factories
+        ]
+        logger.info(
+            f"Started a collector and {len(self._detectors)} detectors "
+            f"on ring {self._ring.name}."
+        )
+
+    def run(self, supervise_interval_seconds: float = 1.0) -> None:
+        """
+        Starts the processes and restarts any that dies, until interrupted.
+        """
+        self.start()
+        try:
+            while True:
+                time.sleep(supervise_interval_seconds)
+                self.supervise()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def supervise(self) -> None:
+        """
+        Restarts the processes that died.
+        """
+        if not self._collector.is_alive():
+            logger.warning(
+                f"Collector exited with code {self._collector.exitcode}, restarting it."
+            )
+            self._collector = self._start_collector()
+
+        for index, detector in enumerate(self._detectors):
+            if not detector.is_alive():
+                logger.warning(
+                    f"Detector {index} exited with code {detector.exitcode}, restarting it."
+                )
+                self._detectors[index] = self._start_detector(
+                    self._module_factories[index]
+                )
+
+    def stop(self, timeout_seconds: float = 5.0) -> None:
+        """
+        Asks every process to stop, terminates the ones that do not within the
+        timeout and frees the ring.
+        """
+        if self._ring is None:
+            return
+
+        self._ring.mark_closed()
+        deadline = time.monotonic() + timeout_seconds
+        for process in [self._collector, *self._detectors]:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.warning(f"Terminating process {process.pid}.")
+                process.terminate()
+                process.join()
+
+        self._ring.close()
+        self._ring.unlink()
+        self._ring = None
+
+    def _start_collector(self) -> multiprocessing.Process:
+        process = multiprocessing.Process(
+            target=_run_collector,
+            args=(
+                self._ring.name,
+                self._monitored_features,
+                self._collection_interval_seconds,
+                self._feature_schedules,
+            ),
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    def _start_detector(self, module_factory: ModuleFactory) -> multiprocessing.Process:
+        process = multiprocessing.Process(
+            target=_run_detector,
+            args=(
+                self._ring.name,
+                module_factory,
+                self._monitored_features,
+                self._poll_interval_seconds,
+                self._detector_log_level,
+            ),
+            daemon=True,
+        )
+        process.start()
+        return process
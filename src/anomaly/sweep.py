@@ -0,0 +1,229 @@
+import copy
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
+from datetime import datetime
+from typing import Any, Mapping, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class SweepGrid(NamedTuple):
+    """
+    The parameters of a method to sweep over.
+
+    The model parameters are passed to the constructor and the method is fitted
+    once for every combination of them. The decision parameters, such as n and
+    threshold, only affect how a fitted method decides, so they are set as
+    attributes on a copy of the fitted method and evaluated without fitting
+    again. Only the parameters a method lists in its decision_parameters are
+    decision parameters, the others of the decision grid, which fit reads, are
+    swept like model parameters.
+    """
+
+    method: type
+    model_grid: Mapping[str, list[Any]] = MappingProxyType({})
+    decision_grid: Mapping[str, list[Any]] = MappingProxyType({})
+
+
+class SweepResult(NamedTuple):
+    method: str
+    params: dict[str, Any]
+    precision: float
+    recall: float
+    f1: float
+    fit_seconds: float
+    predict_microseconds: float
+
+
+def expand_grid(grid: Mapping[str, list[Any]]) -> list[dict[str, Any]]:
+    """
+    Returns every combination of the values in the grid.
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def sweep(
+    grids: list[SweepGrid],
+    X_train: np.ndarray,
+    X_test: np.ndarray,
+    y_test: np.ndarray,
+    n_workers: Optional[int] = None,
+    n_timing_samples: int = 200,
+    timestamps_train: Optional[Sequence[datetime]] = None,
+    timestamps_test: Optional[Sequence[datetime]] = None,
+) -> list[SweepResult]:
+    """
+    Evaluates every parameter combination of the grids on a labeled test set, in
+    a process pool with one task per model configuration.
+
+    Returns the results ranked by F1 score, then by predict cost.
+
+    :param X_train: The normalized samples to fit on, assumed to be normal.
+    :param X_test: The normalized samples to evaluate on.
+    :param y_test: Whether every test sample is an anomaly.
+    :param n_timing_samples: The number of test samples the per-sample predict time
+                             is measured on, through the single-sample predict
+                             the module uses.
+    :param timestamps_train: The timestamps of the training samples, which methods
+                             with uses_timestamps set need.
+    :param timestamps_test: The timestamps of the test samples.
+    """
+    tasks = []
+    for grid in grids:
+        decision_parameters = getattr(grid.method, "decision_parameters", ())
+        model_grid = dict(grid.model_grid)
+        decision_grid = {}
+        for name, values in grid.decision_grid.items():
+            if name in decision_parameters:
+                decision_grid[name] = values
+            else:
+                model_grid[name] = values
+        tasks.extend(
+            (grid.method, model_params, expand_grid(decision_grid))
+            for model_params in expand_grid(model_grid)
+        )
+    if not tasks:
+        return []
+    n_workers = min(n_workers or os.cpu_count() or 1, len(tasks))
+
+    # The data is sent to every worker once, instead of with every task.
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_init_worker,
+        initargs=(
+            X_train,
+            X_test,
+            np.asarray(y_test, dtype=bool),
+            n_timing_samples,
+            timestamps_train,
+            timestamps_test,
+        ),
+    ) as executor:
+        results = [
+            result
+            for task_results in executor.map(_evaluate, *zip(*tasks))
+            for result in task_results
+        ]
+    return sorted(results, key=lambda result: (-result.f1, result.predict_microseconds))
+
+
+def to_frame(results: list[SweepResult]) -> pd.DataFrame:
+    """
+    Returns the results as a table, in their order.
+    """
+    rows = [
+        {
+            "method": result.method,
+            "params": ", ".join(
+                f"{name}={value}" for name, value in result.params.items()
+            ),
+            "precision": result.precision,
+            "recall": result.recall,
+            "f1": result.f1,
+            "fit_s": result.fit_seconds,
+            "predict_us": result.predict_microseconds,
+        }
+        for result in results
+    ]
+    return pd.DataFrame(rows)
+
+
+_data: dict[str, Any] = {}
+
+
+def _init_worker(
+    X_train: np.ndarray,
+    X_test: np.ndarray,
+    y_test: np.ndarray,
+    n_timing_samples: int,
+    timestamps_train: Optional[Sequence[datetime]],
+    timestamps_test: Optional[Sequence[datetime]],
+) -> None:
+    _data.update(
+        X_train=X_train,
+        X_test=X_test,
+        y_test=y_test,
+        n_timing_samples=n_timing_samples,
+        timestamps_train=timestamps_train,
+        timestamps_test=timestamps_test,
+    )
+
+
+def _evaluate(
+    method_class: type,
+    model_params: dict[str, Any],
+    decision_params_list: list[dict[str, Any]],
+) -> list[SweepResult]:
+    """
+    Fits the method once and evaluates every decision parameter combination on it.
+    """
+    X_train, X_test, y_test = _data["X_train"], _data["X_test"], _data["y_test"]
+    n_timing_samples = _data["n_timing_samples"]
+
+    fitted_method = method_class(**model_params)
+    if getattr(fitted_method, "uses_timestamps", False):
+        if _data["timestamps_train"] is None or _data["timestamps_test"] is None:
+            raise ValueError(
+                f"{method_class.__name__} needs the timestamps of the samples, "
+                "pass timestamps_train and timestamps_test to sweep()."
+            )
+        # Like Detector, the timestamps are only passed to methods that use them.
+        timestamps_test = list(_data["timestamps_test"])
+        train_args = (list(_data["timestamps_train"]),)
+    else:
+        timestamps_test = None
+        train_args = ()
+
+    def predict(method, i: int) -> float:
+        if timestamps_test is None:
+            return method.predict(X_test[i])
+        return method.predict(X_test[i], timestamps_test[i])
+
+    started = time.perf_counter()
+    fitted_method.fit(X_train, *train_args)
+    fit_seconds = time.perf_counter() - started
+
+    results = []
+    for decision_params in decision_params_list:
+        # Predicting can change the state of a method, such as a streaming
+        # threshold, so every combination starts from the same fitted method.
+        method = copy.deepcopy(fitted_method)
+        for name, value in decision_params.items():
+            setattr(method, name, value)
+
+        if hasattr(method, "predict_batch") and timestamps_test is None:
+            predictions = method.predict_batch(X_test) > 0
+        else:
+            predictions = np.array([predict(method, i) > 0 for i in range(len(X_test))])
+
+        n_timed = min(n_timing_samples, len(X_test))
+        started = time.perf_counter()
+        for i in range(n_timed):
+            predict(method, i)
+        predict_microseconds = (time.perf_counter() - started) / max(n_timed, 1) * 1e6
+
+        true_positives = np.sum(predictions & y_test)
+        precision = true_positives / max(np.sum(predictions), 1)
+        recall = true_positives / max(np.sum(y_test), 1)
+        f1 = (
+            2 * precision * recall / (precision + recall)
+            if precision + recall > 0
+            else 0.0
+        )
+        results.append(
+            SweepResult(
+                method=method_class.__name__,
+                params={**model_params, **decision_params},
+                precision=float(precision),
+                recall=float(recall),
+                f1=float(f1),
+                fit_seconds=fit_seconds,
+                predict_microseconds=predict_microseconds,
+            )
+        )
+    return results
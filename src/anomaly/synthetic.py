@@ -0,0 +1,391 @@
+"""
+Deterministic synthetic telemetry with labeled anomalies, to evaluate and load
+test modules offline, without sensors, a VM or real stress.
+"""
+
+import math
+import sys
+import types
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Literal, NamedTuple, Optional, Sequence, get_args
+
+import numpy as np
+from scipy.signal import lfilter
+
+AnomalyShape = Literal["spike", "level_shift", "ramp", "oscillation", "dropout"]
+
+ANOMALY_SHAPES: list[AnomalyShape] = list(get_args(AnomalyShape))
+
+# (signal, offset, scale, noise) of every feature. The value is the offset plus
+# the signal, in [0, 1], times the scale, plus gaussian noise.
+FEATURE_MODELS: dict[str, tuple[str, float, float, float]] = {
+    "cpu_usage": ("cpu", 0.05, 0.8, 0.03),
+    "cpu_speed": ("cpu", 1800.0, 2200.0, 50.0),
+    "cpu_temperature": ("cpu_heat", 35.0, 50.0, 0.5),
+    "cpu_fan_speed": ("cpu_heat", 1200.0, 3000.0, 40.0),
+    "ram_usage": ("memory", 0.4, 0.3, 0.005),
+    "vram_usage": ("gpu", 0.1, 0.5, 0.01),
+    "gpu_usage": ("gpu", 0.02, 0.7, 0.03),
+    "gpu_temperature": ("gpu_heat", 35.0, 40.0, 0.5),
+    "gpu_fan_speed": ("gpu_heat", 1000.0, 2500.0, 40.0),
+    "disk_read_bytes": ("io", 1e5, 5e7, 1e5),
+    "disk_write_bytes": ("io", 1e5, 3e7, 1e5),
+    "network_bytes_sent": ("network", 1e4, 1e7, 1e4),
+    "network_bytes_received": ("network", 1e4, 2e7, 1e4),
+    "network_packets_sent": ("network", 10.0, 8000.0, 20.0),
+    "network_packets_received": ("network", 10.0, 15000.0, 20.0),
+    "network_total_active_connections": ("network", 50.0, 200.0, 5.0),
+    "total_processes_count": ("memory", 250.0, 50.0, 2.0),
+    "total_threads_count": ("cpu", 3000.0, 1500.0, 30.0),
+    "total_handles_count": ("memory", 90000.0, 30000.0, 500.0),
+}
+
+FEATURES = list(FEATURE_MODELS)
+
+# Counters are reported cumulatively, like psutil does, and the model gives their rate per second.
+COUNTER_FEATURES = [
+    "disk_read_bytes",
+    "disk_write_bytes",
+    "network_bytes_sent",
+    "network_bytes_received",
+    "network_packets_sent",
+    "network_packets_received",
+]
+
+_FRACTION_FEATURES = ["cpu_usage", "ram_usage", "vram_usage", "gpu_usage"]
+
+
+class InjectedAnomaly(NamedTuple):
+    start: int
+    duration: int
+    shape: AnomalyShape
+    features: tuple[str, ...]
+    magnitude: float
+
+    @property
+    def end(self) -> int:
+        return self.start + self.duration
+
+
+class SyntheticTelemetry(NamedTuple):
+    records: list[dict]
+    labels: np.ndarray
+    anomalies: list[InjectedAnomaly]
+
+
+class DetectionMetrics(NamedTuple):
+    true_alerts: int
+    false_alerts: int
+    detected_events: int
+    total_events: int
+    latencies_seconds: list[float]
+
+    @property
+    def precision(self) -> float:
+        alerts = self.true_alerts + self.false_alerts
+        return self.true_alerts / alerts if alerts else 0.0
+
+    @property
+    def recall(self) -> float:
+        return self.detected_events / self.total_events if self.total_events else 0.0
+
+    def __add__(self, other: "DetectionMetrics") -> "DetectionMetrics":
+        return DetectionMetrics(
+            self.true_alerts + other.true_alerts,
+            self.false_alerts + other.false_alerts,
+            self.detected_events + other.detected_events,
+            self.total_events + other.total_events,
+            self.latencies_seconds + other.latencies_seconds,
+        )
+
+
+class SyntheticTelemetryGenerator:
+    """
+    Generates telemetry of a host whose load follows a daily and weekly cycle
+    with autocorrelated noise.
+
+    The features are driven by a few latent signals (cpu, gpu, memory, disk and
+    network activity), so features of the same signal are correlated, and
+    temperatures and fan speeds follow the load with a thermal lag. The same
+    seed always produces the same telemetry and anomalies.
+    """
+
+    def __init__(
+        self,
+        features: Sequence[str] = FEATURES,
+        interval_seconds: float = 5,
+        start: datetime = datetime(2025, 1, 6, tzinfo=timezone.utc),
+        seed: int = 0,
+        daily_amplitude: float = 0.3,
+        weekend_factor: float = 0.6,
+        noise_scale: float = 1.0,
+        cumulative_counters: bool = True,
+    ) -> None:
+        """
+        :param daily_amplitude: The swing of the load between night and afternoon.
+        :param weekend_factor: How much of the daily swing is left on weekends.
+        :param noise_scale: A factor of the noise of every feature.
+        :param cumulative_counters: Report the counters as running totals, like psutil,
+                                    instead of rates per second.
+        """
+        unknown_features = [f for f in features if f not in FEATURE_MODELS]
+        if unknown_features:
+            raise ValueError(f"Unknown features {unknown_features}.")
+
+        self.features = list(features)
+        self.interval_seconds = interval_seconds
+        self.start = start
+        self.seed = seed
+        self.daily_amplitude = daily_amplitude
+        self.weekend_factor = weekend_factor
+        self.noise_scale = noise_scale
+        self.cumulative_counters = cumulative_counters
+
+    def random_anomalies(
+        self,
+        n_samples: int,
+        n_anomalies: int,
+        start_after: int = 0,
+        shapes: Sequence[AnomalyShape] = ANOMALY_SHAPES,
+        duration_range: tuple[int, int] = (3, 30),
+        magnitude_range: tuple[float, float] = (0.3, 1.0),
+        max_features: int = 3,
+    ) -> list[InjectedAnomaly]:
+        """
+        Returns non-overlapping anomalies at random positions after start_after,
+        for example after the initial learning period of the module.
+        """
+        rng = np.random.default_rng([self.seed, 1])
+        slots = np.sort(
+            rng.choice(
+                np.arange(
+                    start_after, n_samples - duration_range[1], duration_range[1] * 2
+                ),
+                size=n_anomalies,
+                replace=False,
+            )
+        )
+        anomalies = []
+        for start in slots.tolist():
+            n_features = int(rng.integers(1, min(max_features, len(self.features)) + 1))
+            anomalies.append(
+                InjectedAnomaly(
+                    start=start,
+                    duration=int(
+                        rng.integers(duration_range[0], duration_range[1] + 1)
+                    ),
+                    shape=shapes[int(rng.integers(len(shapes)))],
+                    features=tuple(
+                        rng.choice(
+                            self.features, size=n_features, replace=False
+                        ).tolist()
+                    ),
+                    magnitude=float(rng.uniform(*magnitude_range)),
+                )
+            )
+        return anomalies
+
+    def generate(
+        self, n_samples: int, anomalies: Sequence[InjectedAnomaly] = ()
+    ) -> SyntheticTelemetry:
+        """
+        Returns n_samples telemetry records with the anomalies injected, and
+        whether every record is part of an anomaly.
+        """
+        values, labels = self.generate_array(n_samples, anomalies)
+        records = [
+            {"timestamp": self.start + timedelta(seconds=i * self.interval_seconds)}
+            for i in range(n_samples)
+        ]
+        for column, feature in enumerate(self.features):
+            for record, value in zip(records, values[:, column].tolist()):
+                record[feature] = value
+        return SyntheticTelemetry(records, labels, list(anomalies))
+
+    def generate_array(
+        self, n_samples: int, anomalies: Sequence[InjectedAnomaly] = ()
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the telemetry of generate() as a (samples, features) array in
+        features order, without building the records, and the labels.
+        """
+        rng = np.random.default_rng([self.seed, 0])
+        seconds = np.arange(n_samples) * self.interval_seconds
+        signals = self._make_signals(seconds, rng)
+
+        labels = np.zeros(n_samples, dtype=bool)
+        values = {}
+        for feature in self.features:
+            signal, offset, scale, noise = FEATURE_MODELS[feature]
+            values[feature] = (
+                offset
+                + signals[signal] * scale
+                + rng.normal(0, noise * self.noise_scale, size=n_samples)
+            )
+
+        for anomaly in anomalies:
+            if anomaly.end > n_samples:
+                raise ValueError(f"Anomaly at {anomaly.start} ends after the data.")
+            labels[anomaly.start : anomaly.end] = True
+            profile = _get_profile(anomaly.shape, anomaly.duration)
+            for feature in anomaly.features:
+                _, offset, scale, _ = FEATURE_MODELS[feature]
+                window = values[feature][anomaly.start : anomaly.end]
+                if anomaly.shape == "dropout":
+                    window[:] = offset
+                else:
+                    window += anomaly.magnitude * scale * profile
+
+        for feature in self.features:
+            if feature in _FRACTION_FEATURES:
+                values[feature] = np.clip(values[feature], 0, 1)
+            else:
+                values[feature] = np.maximum(values[feature], 0)
+            if self.cumulative_counters and feature in COUNTER_FEATURES:
+                values[feature] = np.cumsum(
+                    np.floor(values[feature] * self.interval_seconds)
+                )
+
+        return np.column_stack([values[feature] for feature in self.features]), labels
+
+    def _make_signals(
+        self, seconds: np.ndarray, rng: np.random.Generator
+    ) -> dict[str, np.ndarray]:
+        timestamps = self.start.timestamp() + seconds
+        hours = (timestamps / 3600) % 24
+        weekdays = (np.floor(timestamps / 86400).astype(np.int64) + 3) % 7
+        # The load is lowest at 3 AM and highest at 3 PM, with a weaker swing on weekends.
+        daily = 0.5 - 0.5 * np.cos(2 * np.pi * (hours - 3) / 24)
+        daily *= np.where(weekdays >= 5, self.weekend_factor, 1.0)
+        load = 0.15 + self.daily_amplitude * daily
+
+        cpu = np.clip(load + self._ar_noise(len(seconds), 0.1, rng), 0, 1)
+        gpu = np.clip(
+            0.5 * load + 0.5 * self._ar_noise(len(seconds), 0.15, rng) + 0.05, 0, 1
+        )
+        io = np.clip(0.5 * cpu + rng.exponential(0.05, size=len(seconds)), 0, 1)
+        network = np.clip(load + self._ar_noise(len(seconds), 0.08, rng), 0, 1)
+        return {
+            "cpu": cpu,
+            "gpu": gpu,
+            "io": io,
+            "network": network,
+            "memory": self._lag(cpu, 1800),
+            "cpu_heat": self._lag(cpu, 60),
+            "gpu_heat": self._lag(gpu, 90),
+        }
+
+    def _ar_noise(self, n: int, scale: float, rng: np.random.Generator) -> np.ndarray:
+        # AR(1) noise with a correlation time of about a minute and the given stationary deviation.
+        phi = math.exp(-self.interval_seconds / 60)
+        innovations = rng.normal(0, scale * math.sqrt(1 - phi * phi), size=n)
+        return lfilter([1.0], [1.0, -phi], innovations)
+
+    def _lag(self, signal: np.ndarray, time_constant_seconds: float) -> np.ndarray:
+        # A first order low-pass filter started at the first value.
+        alpha = 1 - math.exp(-self.interval_seconds / time_constant_seconds)
+        lagged, _ = lfilter(
+            [alpha], [1.0, alpha - 1], signal, zi=[(1 - alpha) * signal[0]]
+        )
+        return lagged
+
+
+def evaluate_detections(
+    decisions: Sequence[Optional[bool]],
+    telemetry: SyntheticTelemetry,
+    grace_samples: int = 3,
+) -> DetectionMetrics:
+    """
+    Scores the decisions of a module on the records of the synthetic telemetry.
+
+    An alert is true when it falls in an anomaly or within grace_samples after
+    it, since features derived over several samples may lag. Only anomalies
+    that start on a tick checked for anomalies (not None) count as events, and
+    the latency of an event is the time from its start to its first alert.
+    """
+    alerts = np.array([bool(decision) for decision in decisions])
+    in_window = np.zeros(len(alerts), dtype=bool)
+    detected_events = 0
+    total_events = 0
+    latencies_seconds = []
+    for anomaly in telemetry.anomalies:
+        end = min(anomaly.end + grace_samples, len(alerts))
+        in_window[anomaly.start : end] = True
+        if anomaly.start >= len(decisions) or decisions[anomaly.start] is None:
+            continue
+
+        total_events += 1
+        hits = np.flatnonzero(alerts[anomaly.start : end])
+        if len(hits):
+            detected_events += 1
+            first_alert = telemetry.records[anomaly.start + hits[0]]["timestamp"]
+            start_time = telemetry.records[anomaly.start]["timestamp"]
+            latencies_seconds.append((first_alert - start_time).total_seconds())
+
+    return DetectionMetrics(
+        true_alerts=int(np.sum(alerts & in_window)),
+        false_alerts=int(np.sum(alerts & ~in_window)),
+        detected_events=detected_events,
+        total_events=total_events,
+        latencies_seconds=latencies_seconds,
+    )
+
+
+def _get_profile(shape: AnomalyShape, duration: int) -> np.ndarray:
+    """
+    Returns the relative deviation over the duration of an anomaly of the shape.
+    """
+    if shape == "spike":
+        # Peaks immediately and decays to a third by the end.
+        return np.exp(-np.arange(duration) / max(duration, 1))
+    if shape == "level_shift" or shape == "dropout":
+        return np.ones(duration)
+    if shape == "ramp":
+        return np.linspace(1 / duration, 1, duration)
+    if shape == "oscillation":
+        return np.where(np.arange(duration) % 2 == 0, 1.0, -1.0)
+    raise ValueError(f"Unknown anomaly shape {shape}.")
+
+
+# The provider modules and the features their get_<feature>() functions return.
+_PROVIDER_FEATURES = {
+    "cpu": ["cpu_usage", "cpu_speed", "cpu_temperature"],
+    "gpu": ["gpu_usage", "gpu_temperature", "vram_usage"],
+    "fan": ["cpu_fan_speed", "gpu_fan_speed"],
+    "memory": ["ram_usage"],
+    "disk": ["disk_read_bytes", "disk_write_bytes"],
+    "network": [
+        "network_bytes_sent",
+        "network_bytes_received",
+        "network_packets_sent",
+        "network_packets_received",
+        "network_total_active_connections",
+    ],
+    "process": ["total_processes_count", "total_threads_count", "total_handles_count"],
+}
+
+
+def install_stub_providers(seed: int = 0) -> None:
+    """
+    Replaces the hardware providers with synthetic ones, so that the package
+    can be used offline on machines without sensors, LibreHardwareMonitor or
+    Windows. Must be called before anything from the package that imports the
+    providers, such as anomaly.collection or anomaly.module.
+    """
+    rng = np.random.default_rng(seed)
+
+    def make_provider(feature: str) -> Callable[..., float]:
+        _, offset, scale, noise = FEATURE_MODELS[feature]
+        return lambda *args, **kwargs: max(
+            offset + rng.beta(2, 5) * scale + rng.normal(0, noise), 0
+        )
+
+    for module_name, features in _PROVIDER_FEATURES.items():
+        module = types.ModuleType(f"{__package__}.providers.{module_name}")
+        for feature in features:
+            setattr(module, f"get_{feature}", make_provider(feature))
+        sys.modules[module.__name__] = module
+
+    cpu = sys.modules[f"{__package__}.providers.cpu"]
+    cpu.get_cpu_min_speed = lambda: 800.0
+    cpu.get_cpu_max_speed = lambda: 4800.0
@@ -0,0 +1,100 @@
+class P2Quantile:
+    """
+    Streaming estimate of a single quantile with the P-square algorithm
+    (Jain & Chlamtac, 1985).
+
+    Only five markers are kept, so the memory is constant regardless of how
+    many values have been observed, and every update costs O(1).
+    """
+
+    def __init__(self, quantile: float) -> None:
+        if not 0 < quantile < 1:
+            raise ValueError("Quantile must be in the (0, 1) range.")
+
+        self.quantile = quantile
+        self.count = 0
+        self._heights: list[float] = []
+        self._positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self._desired_positions = [
+            1.0,
+            1 + 2 * quantile,
+            1 + 4 * quantile,
+            3 + 2 * quantile,
+            5.0,
+        ]
+        self._increments = [0.0, quantile / 2, quantile, (1 + quantile) / 2, 1.0]
+
+    @property
+    def value(self) -> float:
+        """
+        Returns the current estimate of the quantile.
+        """
+        if self.count == 0:
+            raise Exception("Quantile is not defined before the first update.")
+
+        if self.count < 5:
+            # Until the markers are initialized the estimate is exact.
+            heights = sorted(self._heights)
+            return heights[round(self.quantile * (len(heights) - 1))]
+
+        return self._heights[2]
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        heights = self._heights
+
+        if self.count <= 5:
+            heights.append(value)
+            if self.count == 5:
+                heights.sort()
+            return
+
+        # Find the cell k the value falls into, extending the extreme markers.
+        if value < heights[0]:
+            heights[0] = value
+            k = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            k = 3
+        else:
+            k = 0
+            while value >= heights[k + 1]:
+                k += 1
+
+        positions = self._positions
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self._desired_positions[i] += self._increments[i]
+
+        # Move the middle markers towards their desired positions.
+        for i in range(1, 4):
+            offset = self._desired_positions[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or (
+                offset <= -1 and positions[i - 1] - positions[i] < -1
+            ):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = self._linear(i, step)
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        heights = self._heights
+        positions = self._positions
+        return heights[i] + step / (positions[i + 1] - positions[i - 1]) * (
+            (positions[i] - positions[i - 1] + step)
+            * (heights[i + 1] - heights[i])
+            / (positions[i + 1] - positions[i])
+            + (positions[i + 1] - positions[i] - step)
+            * (heights[i] - heights[i - 1])
+            / (positions[i] - positions[i - 1])
+        )
+
+    def _linear(self, i: int, step: int) -> float:
+        heights = self._heights
+        positions = self._positions
+        return heights[i] + step * (heights[i + step] - heights[i]) / (
+            positions[i + step] - positions[i]
+        )
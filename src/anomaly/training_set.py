@@ -0,0 +1,169 @@
+import heapq
+from abc import ABC, abstractmethod
+import math
+import random
+from collections import deque
+from typing import Optional
+
+
+class TrainingSet(ABC):
+    """
+    The telemetry the detectors are trained on, holding a bounded sample of
+    the records added to it so that the cost of fitting stays predictable.
+    """
+
+    @abstractmethod
+    def add(self, telemetry: dict) -> None:
+        pass
+
+    @abstractmethod
+    def samples(self) -> list[dict]:
+        """
+        Returns the records to train on, in the order they were added.
+        """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+
+class FifoTrainingSet(TrainingSet):
+    """
+    The most recent max_size records.
+
+    Without a max_size the set grows until the first training and keeps that
+    size afterwards, so it holds the length of the initial learning period.
+    """
+
+    def __init__(self, max_size: Optional[int] = None) -> None:
+        self._records: deque[dict] = deque(maxlen=max_size)
+
+    def add(self, telemetry: dict) -> None:
+        self._records.append(telemetry)
+
+    def samples(self) -> list[dict]:
+        if self._records.maxlen is None:
+            self._records = deque(self._records, maxlen=len(self._records))
+        return list(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+class ReservoirTrainingSet(TrainingSet):
+    """
+    A uniform sample of every record ever added (reservoir sampling, Algorithm R),
+    so the training data covers the whole history at a fixed size.
+    """
+
+    def __init__(self, max_size: int = 5000, random_state: Optional[int] = None):
+        self.max_size = max_size
+        self._random = random.Random(random_state)
+        self._records: list[tuple[int, dict]] = []
+        self._count = 0
+
+    def add(self, telemetry: dict) -> None:
+        if len(self._records) < self.max_size:
+            self._records.append((self._count, telemetry))
+        else:
+            index = self._random.randrange(self._count + 1)
+            if index < self.max_size:
+                self._records[index] = (self._count, telemetry)
+        self._count += 1
+
+    def samples(self) -> list[dict]:
+        return [telemetry for _, telemetry in sorted(self._records, key=_by_order)]
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+class TimeStratifiedTrainingSet(TrainingSet):
+    """
+    A uniform sample of the records of every hour of the week, so daily and
+    weekly patterns stay represented however long ago they were last seen.
+    """
+
+    _HOURS_PER_WEEK = 168
+
+    def __init__(self, max_size: int = 8400, random_state: Optional[int] = None):
+        """
+        :param max_size: The total size, split evenly between the hours of the week.
+        """
+        self._bucket_size = max(max_size // self._HOURS_PER_WEEK, 1)
+        self._random = random.Random(random_state)
+        self._buckets: list[list[tuple[int, dict]]] = [
+            [] for _ in range(self._HOURS_PER_WEEK)
+        ]
+        self._counts = [0] * self._HOURS_PER_WEEK
+        self._order = 0
+
+    def add(self, telemetry: dict) -> None:
+        timestamp = telemetry["timestamp"]
+        hour = timestamp.weekday() * 24 + timestamp.hour
+        bucket = self._buckets[hour]
+        if len(bucket) < self._bucket_size:
+            bucket.append((self._order, telemetry))
+        else:
+            index = self._random.randrange(self._counts[hour] + 1)
+            if index < self._bucket_size:
+                bucket[index] = (self._order, telemetry)
+        self._counts[hour] += 1
+        self._order += 1
+
+    def samples(self) -> list[dict]:
+        records = [record for bucket in self._buckets for record in bucket]
+        return [telemetry for _, telemetry in sorted(records, key=_by_order)]
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._buckets)
+
+
+class RecencyWeightedTrainingSet(TrainingSet):
+    """
+    A sample in which the weight of a record halves every half_life_seconds
+    (weighted reservoir sampling, Efraimidis & Spirakis), so recent behavior
+    dominates while older records still appear.
+
+    The keys u^(1 / w) with w = exp(t * ln 2 / half life) are compared by their
+    monotone transform t * ln 2 / half life - ln(-ln u), which does not overflow.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 5000,
+        half_life_seconds: float = 7 * 24 * 3600,
+        random_state: Optional[int] = None,
+    ) -> None:
+        self.max_size = max_size
+        self.half_life_seconds = half_life_seconds
+        self._random = random.Random(random_state)
+        self._heap: list[tuple[float, int, dict]] = []
+        self._start_time = None
+        self._order = 0
+
+    def add(self, telemetry: dict) -> None:
+        if self._start_time is None:
+            self._start_time = telemetry["timestamp"]
+        elapsed_seconds = (telemetry["timestamp"] - self._start_time).total_seconds()
+        u = 1.0 - self._random.random()
+        key = elapsed_seconds * math.log(2) / self.half_life_seconds - math.log(
+            -math.log(u) if u < 1.0 else 1e-300
+        )
+
+        record = (key, self._order, telemetry)
+        if len(self._heap) < self.max_size:
+            heapq.heappush(self._heap, record)
+        elif key > self._heap[0][0]:
+            heapq.heapreplace(self._heap, record)
+        self._order += 1
+
+    def samples(self) -> list[dict]:
+        return [telemetry for _, _, telemetry in sorted(self._heap, key=lambda r: r[1])]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+def _by_order(record: tuple[int, dict]) -> int:
+    return record[0]